@@ -199,10 +199,13 @@ class BinanceAccountClient(BaseClient):
         symbol: str,
         limit: int = 500,
         start_time: Optional[int] = None,
-        end_time: Optional[int] = None
+        end_time: Optional[int] = None,
+        order_id: Optional[int] = None
     ) -> Optional[List[Dict[str, Any]]]:
         """
         Obtiene todas las órdenes para un símbolo específico.
+
+        :param order_id: Si se indica, devuelve las órdenes con orderId >= order_id (sin límite de ventana temporal).
         """
         endpoint = "api/v3/allOrders"
         params = {
@@ -210,6 +213,8 @@ class BinanceAccountClient(BaseClient):
             "limit": limit
         }
 
+        if order_id is not None:
+            params["orderId"] = order_id
         if start_time:
             params["startTime"] = start_time
         if end_time:
@@ -219,9 +224,39 @@ class BinanceAccountClient(BaseClient):
         params = self._get_authenticated_params(params)
 
         response = self.get(endpoint, params=params, headers=self.headers)
-        if response:
+        # Una lista vacía es una respuesta válida (sin órdenes en el rango pedido)
+        if response is not None:
             # logger.info(f"Órdenes obtenidas: {response}")
+            for order in response:
+                _parse_order_amounts(order)
             return response
         else:
             logger.error("Error al obtener órdenes.")
             return None
+
+    def get_order(self, symbol: str, order_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Consulta el estado actual de una orden concreta.
+
+        :param symbol: Símbolo del par.
+        :param order_id: Identificador de la orden en Binance.
+        :return: Orden con los importes ya en float, o None si falla la consulta.
+        """
+        endpoint = "api/v3/order"
+        params = self._get_authenticated_params({"symbol": symbol, "orderId": order_id})
+
+        response = self.get(endpoint, params=params, headers=self.headers)
+        if response:
+            return _parse_order_amounts(response)
+        logger.error(f"Error al consultar la orden {order_id} de {symbol}.")
+        return None
+
+
+def _parse_order_amounts(order: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte una sola vez los importes de la orden (Binance los envía como cadenas).
+    """
+    for field in ("executedQty", "origQty", "price", "cummulativeQuoteQty"):
+        if field in order:
+            order[field] = float(order[field])
+    return order
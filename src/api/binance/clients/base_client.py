@@ -1,36 +1,91 @@
 # src/api/binance/clients/base_client.py
 
+import threading
+import time
 import requests
 import logging
 from typing import Any, Dict, Optional
 from requests.adapters import HTTPAdapter, Retry
 from urllib.parse import urljoin
-from config.binance import BINANCE_BASE_URL
+from config.binance import BINANCE_BASE_URL, BINANCE_WEIGHT_LIMIT_1M, BINANCE_WEIGHT_THROTTLE_RATIO
+from config.settings import settings
+from config.default import DEFAULT_SELL_MAX_CONCURRENT_ASSETS
 from utils.logger import setup_logger
+from utils.json_utils import json_loads
 
 logger = setup_logger()
 
 class BaseClient:
+    # Conexiones keep-alive de la sesión compartida: workers de compra + workers de venta + margen
+    # para el ejecutor de órdenes y las consultas sueltas del hilo principal
+    POOL_MAXSIZE = settings.MAX_WORKERS + DEFAULT_SELL_MAX_CONCURRENT_ASSETS + 4
+    # Peso usado en el minuto actual según Binance; compartido por todos los clientes (límite por IP)
+    _used_weight = 0
+    _weight_lock = threading.Lock()
+    # Sesión HTTP compartida por todos los clientes: la app crea varios BinanceDataManager
+    # y así todos reutilizan las mismas conexiones keep-alive en lugar de repetir el handshake TLS
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
     def __init__(self, base_url: str = BINANCE_BASE_URL, timeout: int = 10):
         """
         Cliente base para manejar solicitudes HTTP a la API de Binance.
         """
         self.base_url = base_url
-        self.session = requests.Session()
-        retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        self.session = self._shared_session()
         self.timeout = timeout
 
+    @classmethod
+    def _shared_session(cls) -> requests.Session:
+        """
+        Devuelve la sesión HTTP común, creándola la primera vez.
+        """
+        with cls._session_lock:
+            if BaseClient._session is None:
+                session = requests.Session()
+                retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+                # Una conexión keep-alive por hilo concurrente para que todos reutilicen TCP/TLS
+                session.mount('https://', HTTPAdapter(max_retries=retries, pool_maxsize=cls.POOL_MAXSIZE))
+                BaseClient._session = session
+            return BaseClient._session
+
+    def _wait_for_weight(self) -> None:
+        """
+        Bloquea hasta el siguiente minuto solo si el peso usado se acerca al límite de Binance.
+        """
+        threshold = BINANCE_WEIGHT_LIMIT_1M * BINANCE_WEIGHT_THROTTLE_RATIO
+        with BaseClient._weight_lock:
+            used = BaseClient._used_weight
+            if used < threshold:
+                return
+            wait = 60 - (time.time() % 60)
+        # Dormir fuera del lock para no bloquear al resto de hilos que leen o actualizan el peso
+        logger.warning(f"Peso usado {used}/{BINANCE_WEIGHT_LIMIT_1M}: esperando {wait:.1f}s al siguiente minuto.")
+        time.sleep(wait)
+        with BaseClient._weight_lock:
+            BaseClient._used_weight = 0
+
+    def _record_weight(self, response: requests.Response) -> None:
+        """
+        Actualiza el peso usado a partir de la cabecera de la respuesta.
+        """
+        used = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            with BaseClient._weight_lock:
+                BaseClient._used_weight = int(used)
+
     def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         Realiza una solicitud GET.
         """
         url = urljoin(self.base_url, endpoint)
         try:
+            self._wait_for_weight()
             response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            self._record_weight(response)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return json_loads(response.content)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"GET request failed: {e}")
             logger.debug(f"Endpoint: {url}, Params: {params}, Headers: {headers}")
             return None
@@ -41,19 +96,21 @@ class BaseClient:
         """
         url = urljoin(self.base_url, endpoint)
         try:
+            self._wait_for_weight()
             response = self.session.post(url, params=params, headers=headers, timeout=self.timeout)
+            self._record_weight(response)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except requests.exceptions.HTTPError as http_err:
             # Intenta obtener más detalles del error
             try:
-                error_info = response.json()
+                error_info = json_loads(response.content)
                 logger.error(f"HTTP error occurred: {http_err} - Detalles: {error_info}")
             except ValueError:
                 # Si la respuesta no es JSON, simplemente registra el texto
                 logger.error(f"HTTP error occurred: {http_err} - Respuesta: {response.text}")
             return None
-        except requests.exceptions.RequestException as req_err:
+        except (requests.exceptions.RequestException, ValueError) as req_err:
             # Maneja otras excepciones de Requests
             logger.error(f"Request exception occurred: {req_err}")
             return None
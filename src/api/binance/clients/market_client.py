@@ -74,6 +74,15 @@ class BinanceMarketClient(BaseClient):
             logger.debug(f"No se pudo obtener el precio para {symbol}.")
             return None
 
+    def get_all_prices(self) -> Dict[str, float]:
+        """
+        Obtiene el precio actual de todos los pares en una sola petición.
+        """
+        data = self.get("api/v3/ticker/price") or []
+        prices = {item["symbol"]: float(item["price"]) for item in data if "symbol" in item and "price" in item}
+        logger.debug(f"Precios obtenidos para {len(prices)} pares.")
+        return prices
+
     def get_top_cryptocurrencies(self, top_n: int = 10, by: str = "price") -> List[Dict[str, Any]]:
         """
         Obtiene las principales criptomonedas por precio o volumen.
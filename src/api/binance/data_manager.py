@@ -6,18 +6,30 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 from api.binance.clients.account_client import BinanceAccountClient
 from api.binance.clients.market_client import BinanceMarketClient
+from api.binance.order_store import OrderStore
+from config.settings import settings
+from utils.cache import TTLCache
 from utils.date_utils import interval_to_milliseconds
 from utils.logger import setup_logger
 
 logger = setup_logger()
 
 class BinanceDataManager:
+    # Validez (segundos) de los metadatos de exchangeInfo por símbolo; los filtros apenas cambian
+    SYMBOL_INFO_TTL = 3600
+
     def __init__(self):
         """
         Inicializa el administrador de datos, unificando acceso a clientes de Binance.
         """
         self.market_client = BinanceMarketClient()
         self.account_client = BinanceAccountClient()
+        # Historial de órdenes persistido localmente para pedir a Binance solo las nuevas
+        self.order_store = OrderStore(settings.ORDERS_DB_PATH)
+        # Saldos libres ya convertidos a float, indexados por activo (último resumen obtenido)
+        self._balance_free: Dict[str, float] = {}
+        # exchangeInfo por símbolo: se consulta antes de cada orden para ajustar decimales
+        self._symbol_info_cache = TTLCache(maxsize=1024, ttl=self.SYMBOL_INFO_TTL)
 
     ## Operaciones de Precios y Datos de Mercado
     def get_price(self, symbol: str) -> Optional[float]:
@@ -26,6 +38,12 @@ class BinanceDataManager:
         """
         return self.market_client.get_price(symbol)
 
+    def get_all_prices(self) -> Dict[str, float]:
+        """
+        Obtiene el precio actual de todos los pares de mercado en una sola petición.
+        """
+        return self.market_client.get_all_prices()
+
     def fetch_historical_data(
         self,
         symbol: str,
@@ -111,7 +129,17 @@ class BinanceDataManager:
         """
         Obtiene el resumen de balances de la cuenta autenticada.
         """
-        return self.account_client.get_balance_summary()
+        balances = self.account_client.get_balance_summary()
+        # Indexar en la misma pasada los saldos libres (el cliente ya los entrega como float)
+        self._balance_free = {b['asset']: b['free'] for b in balances}
+        return balances
+
+    def get_free_balances(self) -> Dict[str, float]:
+        """
+        Obtiene los saldos libres actuales indexados por activo.
+        """
+        self.get_balance_summary()
+        return self._balance_free
 
     def create_order(
         self,
@@ -136,8 +164,31 @@ class BinanceDataManager:
     ) -> Optional[List[Dict[str, Any]]]:
         """
         Obtiene todas las órdenes realizadas para un símbolo específico.
+
+        Sin rango explícito, solo descarga las órdenes nuevas desde la última consulta y refresca
+        las que seguían abiertas, las guarda en el almacén local y devuelve el historial completo almacenado.
         """
-        return self.account_client.get_all_orders(symbol, limit, start_time, end_time)
+        if start_time is not None or end_time is not None:
+            return self.account_client.get_all_orders(symbol, limit, start_time, end_time)
+
+        # Las órdenes abiertas se consultan una a una para no anclar la paginación a la más antigua
+        for order_id in self.order_store.open_order_ids(symbol):
+            order = self.account_client.get_order(symbol, order_id)
+            if order is not None:
+                self.order_store.upsert([order])
+
+        # Paginar por orderId: a diferencia de startTime, no está limitado a una ventana de 24h
+        resume = self.order_store.next_order_id(symbol)
+        while True:
+            batch = self.account_client.get_all_orders(symbol, limit, order_id=resume)
+            if batch is None:
+                return None
+            self.order_store.upsert(batch)
+            # Sin histórico previo Binance devuelve las más recientes; con orderId se pagina hacia delante
+            if resume is None or len(batch) < limit:
+                break
+            resume = max(order["orderId"] for order in batch) + 1
+        return self.order_store.get_orders(symbol)
 
     ## Funcionalidades Combinadas
     def fetch_combined_data(self, symbol: str = "BTCUSDC") -> Dict[str, Any]:
@@ -166,9 +217,11 @@ class BinanceDataManager:
 
     def fetch_symbol_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
-        Obtiene los datos de un símbolo específico.
+        Obtiene los datos de un símbolo específico, reutilizándolos durante SYMBOL_INFO_TTL segundos.
         """
-        return self.market_client.get("api/v3/exchangeInfo", params={"symbol": symbol})
+        return self._symbol_info_cache.get_or_set(
+            symbol, lambda: self.market_client.get("api/v3/exchangeInfo", params={"symbol": symbol})
+        )
     
     def get_market_volatility(
         self,
@@ -0,0 +1,97 @@
+# src/api/binance/order_store.py
+
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Estados en los que una orden ya no puede cambiar
+FINAL_STATUSES = ("FILLED", "CANCELED", "REJECTED", "EXPIRED", "EXPIRED_IN_MATCH")
+
+# Sentencias fijas, construidas una sola vez: sqlite3 reutiliza la sentencia preparada por texto
+_OPEN_IDS_SQL = (
+    "SELECT orderId FROM orders WHERE symbol = ? "
+    f"AND status NOT IN ({','.join('?' * len(FINAL_STATUSES))}) ORDER BY orderId"
+)
+_LAST_ID_SQL = "SELECT MAX(orderId) FROM orders WHERE symbol = ?"
+_UPSERT_SQL = (
+    "INSERT OR REPLACE INTO orders "
+    "(symbol, orderId, side, status, executedQty, price, cummulativeQuoteQty, time) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SELECT_SQL = (
+    "SELECT symbol, orderId, side, status, executedQty, price, cummulativeQuoteQty, time "
+    "FROM orders WHERE symbol = ? ORDER BY time, orderId"
+)
+
+
+class OrderStore:
+    """
+    Almacén local (SQLite) del historial de órdenes de Binance, para descargar solo las nuevas.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Ruta del fichero SQLite (':memory:' para no persistir).
+        """
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS orders ("
+                " symbol TEXT NOT NULL,"
+                " orderId INTEGER NOT NULL,"
+                " side TEXT,"
+                " status TEXT,"
+                " executedQty REAL,"
+                " price REAL,"
+                " cummulativeQuoteQty REAL,"
+                " time INTEGER,"
+                " PRIMARY KEY (symbol, orderId))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_symbol_time ON orders (symbol, time)")
+
+    def next_order_id(self, symbol: str) -> Optional[int]:
+        """
+        Calcula desde qué orderId hay que volver a pedir órdenes a Binance.
+
+        :param symbol: Símbolo del par.
+        :return: El siguiente al mayor orderId guardado; None si no hay nada almacenado para el símbolo.
+        """
+        with self._lock:
+            last_id = self._conn.execute(_LAST_ID_SQL, (symbol,)).fetchone()[0]
+        return None if last_id is None else last_id + 1
+
+    def open_order_ids(self, symbol: str) -> List[int]:
+        """
+        Devuelve los orderId almacenados que aún no están en un estado final.
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute(_OPEN_IDS_SQL, (symbol, *FINAL_STATUSES))]
+
+    def upsert(self, orders: List[Dict[str, Any]]) -> None:
+        """
+        Inserta o actualiza órdenes tal y como las devuelve Binance, convirtiendo los importes a float.
+        """
+        rows = [
+            (
+                o["symbol"], o["orderId"], o["side"], o["status"],
+                float(o["executedQty"]), float(o["price"]), float(o["cummulativeQuoteQty"]), o["time"]
+            )
+            for o in orders
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT_SQL, rows)
+
+    def get_orders(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Devuelve las órdenes almacenadas del símbolo en orden cronológico, con importes ya en float.
+        """
+        with self._lock:
+            cursor = self._conn.execute(_SELECT_SQL, (symbol,))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -3,6 +3,7 @@ from requests import Session
 from requests.exceptions import RequestException, HTTPError
 from config.coingecko import API_URL, LANGUAGE
 from utils.logger import setup_logger
+from utils.json_utils import json_loads
 from typing import Optional, Dict, Any, List
 
 logger = setup_logger()
@@ -23,7 +24,7 @@ class CoinGeckoClient:
         try:
             response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
-            return response.json()
+            return json_loads(response.content)
         except HTTPError as http_err:
             logger.error(f"HTTP error: {http_err}")
         except RequestException as req_err:
@@ -1,8 +1,19 @@
 import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from utils.json_utils import json_loads
+
 
 class BaseNewsAPI:
+    # Sesión compartida por todos los clientes de noticias: mantiene vivas las conexiones TLS
+    # entre llamadas en lugar de abrir una nueva en cada requests.get
+    _session = requests.Session()
+    _session.mount('https://', HTTPAdapter(
+        pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.3)
+    ))
+
     def __init__(self):
-        pass
+        self.session = BaseNewsAPI._session
     
     def send_request(self, url, params=None, headers=None):
         """
@@ -12,9 +23,9 @@ class BaseNewsAPI:
         :param headers: Encabezados de la solicitud.
         :return: Respuesta en formato JSON.
         """
-        response = requests.get(url, params=params, headers=headers)
+        response = self.session.get(url, params=params, headers=headers)
 
         if response.status_code == 200:
-            return response.json()
+            return json_loads(response.content)
         else:
             raise Exception(f"Error en la solicitud: {response.status_code} - {response.text}")
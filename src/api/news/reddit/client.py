@@ -21,7 +21,7 @@ class RedditClient(BaseNewsAPI):
         data = {"grant_type": "client_credentials"}
         headers = {"User-Agent": REDDIT_USER_AGENT}
 
-        response = requests.post(self.token_url, auth=auth, data=data, headers=headers)
+        response = self.session.post(self.token_url, auth=auth, data=data, headers=headers)
         if response.status_code == 200:
             return response.json()["access_token"]
         else:
@@ -34,6 +34,7 @@ class OpenAIClient:
         self.client = OpenAI(api_key=self.api_key)
         self.model = model
         self.tokenizer_model = tokenizer_model
+        self._tokenizer = None
         logger.info(f"Cliente inicializado con modelo '{self.model}'.")
 
     def _validate_prompt_length(self, prompt: str) -> bool:
@@ -43,7 +44,10 @@ class OpenAIClient:
         :return: True si el prompt es válido, False si excede el límite.
         """
         try:
-            tokenizer = GPT2Tokenizer.from_pretrained(self.tokenizer_model)
+            # Cargar el tokenizador una sola vez: from_pretrained lee el modelo de disco
+            if self._tokenizer is None:
+                self._tokenizer = GPT2Tokenizer.from_pretrained(self.tokenizer_model)
+            tokenizer = self._tokenizer
             num_tokens = len(tokenizer.encode(prompt))
             logger.debug(f"El prompt tiene {num_tokens} tokens.")
             
@@ -1,3 +1,5 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
 import logging
 from config.default import (
@@ -14,6 +16,23 @@ from utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Velas a partir de las cuales los indicadores de ventana no dependen del inicio de la serie
+_WARMUP = max(SMA_LONG_PERIOD, BB_PERIOD, RSI_PERIOD + 1, 2 * ADX_PERIOD, STOCHASTIC_PERIOD, 20)
+
+def _sma(values, window):
+    """
+    Media móvil simple con una convolución de NumPy; las primeras window-1 posiciones quedan en NaN
+    como en pandas rolling().mean().
+
+    :param values: Array de precios.
+    :param window: Tamaño de la ventana.
+    :return: Array del mismo tamaño que values.
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = np.convolve(values, np.ones(window) / window, mode='valid')
+    return out
+
 class MarketAnalyzer:
     """
     Analizador de mercado para criptomonedas basado en múltiples indicadores técnicos.
@@ -30,30 +49,102 @@ class MarketAnalyzer:
             raise ValueError("Datos insuficientes para realizar el análisis.")
 
         self.data = data
-        self.close_prices = pd.Series([float(kline[4]) for kline in data])
-        self.timestamps = pd.to_datetime([kline[0] for kline in data], unit='ms')
-        self.volume = pd.Series([float(kline[5]) for kline in data])
-        self.high = pd.Series([float(kline[2]) for kline in data])
-        self.low = pd.Series([float(kline[3]) for kline in data])
         self.symbol = symbol
-        
-        # Registrar precio de apertura para momentum
-        self.open_prices = pd.Series([float(kline[1]) for kline in data])
-        self.df = pd.DataFrame({
-            'open': self.open_prices,
-            'close': self.close_prices,
-            'volume': self.volume,
-            'high': self.high,
-            'low': self.low,
-            'timestamp': self.timestamps
+        self._set_frame(self._klines_frame(data))
+        self._prepare_indicators()
+
+    @staticmethod
+    def _klines_frame(data):
+        """
+        Convierte velas de Binance en un DataFrame OHLCV indexado por timestamp.
+
+        :param data: Lista de listas con datos de Kline de Binance.
+        :return: DataFrame con columnas open, close, volume, high y low.
+        """
+        # Un único cast vectorizado de las columnas OHLCV en lugar de un float() por celda y columna
+        raw = np.asarray(data, dtype=object)
+        ohlcv = raw[:, 1:6].astype(np.float64)
+        frame = pd.DataFrame({
+            'open': ohlcv[:, 0],
+            'close': ohlcv[:, 3],
+            'volume': ohlcv[:, 4],
+            'high': ohlcv[:, 1],
+            'low': ohlcv[:, 2],
+            'timestamp': pd.to_datetime(raw[:, 0].astype(np.int64), unit='ms')
         })
-        self.df.set_index('timestamp', inplace=True)
+        frame.set_index('timestamp', inplace=True)
+        return frame
+
+    def _set_frame(self, frame):
+        """Inicializa series de precios, flags y el DataFrame de trabajo a partir de velas OHLCV."""
+        self.close_prices = frame['close'].reset_index(drop=True)
+        self.timestamps = frame.index
+        self.volume = frame['volume'].reset_index(drop=True)
+        self.high = frame['high'].reset_index(drop=True)
+        self.low = frame['low'].reset_index(drop=True)
+        # Registrar precio de apertura para momentum
+        self.open_prices = frame['open'].reset_index(drop=True)
+        self.df = frame.copy()
         # Flag para override de burbuja
         self.bubble_override = False
         self.bubble_detected = False
         # Flag para validación de precio de venta
         self.sell_price_invalid = False
-        self._prepare_indicators()
+        # Condiciones de la última vela, calculadas una única vez
+        self._signals = None
+
+    def _base_frame(self):
+        """Reconstruye el DataFrame OHLCV original (sin indicadores) desde las series almacenadas."""
+        return pd.DataFrame({
+            'open': self.open_prices.values,
+            'close': self.close_prices.values,
+            'volume': self.volume.values,
+            'high': self.high.values,
+            'low': self.low.values
+        }, index=self.timestamps)
+
+    def extend(self, prefix_data):
+        """
+        Devuelve un nuevo analizador con velas más antiguas antepuestas, reutilizando los
+        indicadores ya calculados para el tramo compartido.
+
+        Los indicadores de ventana (SMA, RSI, Bollinger, ADX, estocástico, volumen) solo se
+        recalculan para las velas nuevas y las primeras _WARMUP velas actuales, que antes no
+        tenían ventana completa; el resto de filas se reutiliza tal cual. EMA y MACD dependen
+        de su semilla, por lo que se recalculan en una sola pasada sobre el cierre completo.
+
+        :param prefix_data: Velas de Binance anteriores a la primera vela de este analizador.
+        :return: Nuevo MarketAnalyzer sobre prefix_data + data.
+        """
+        if not prefix_data:
+            return self
+
+        base = self._base_frame()
+        extended = MarketAnalyzer.__new__(MarketAnalyzer)
+        extended.data = list(prefix_data) + list(self.data)
+        extended.symbol = self.symbol
+        extended._set_frame(pd.concat([self._klines_frame(prefix_data), base]))
+
+        # Tramo a recalcular: velas nuevas + calentamiento de las velas ya analizadas
+        warmup = min(_WARMUP, len(base))
+        head = MarketAnalyzer.__new__(MarketAnalyzer)
+        head.df = extended.df.iloc[:len(prefix_data) + warmup].copy()
+        head._calculate_sma()
+        head._calculate_rsi()
+        head._calculate_bollinger_bands()
+        head._calculate_adx()
+        head._calculate_stochastic()
+        head._calculate_volume()
+        window_cols = [col for col in head.df.columns if col not in base.columns]
+
+        # Filas con ventana completa en el análisis original: indicadores idénticos
+        tail = self.df.loc[self.df.index.isin(base.index[warmup:]), window_cols]
+        extended.df = extended.df.join(pd.concat([head.df[window_cols], tail]))
+        extended._calculate_ema()
+        extended._calculate_macd()
+        extended.df.dropna(inplace=True)
+        extended.indicators = extended.df.copy()
+        return extended
 
     def _prepare_indicators(self):
         """Calcula todos los indicadores técnicos necesarios."""
@@ -72,8 +163,9 @@ class MarketAnalyzer:
 
     def _calculate_sma(self):
         """Calcula las Medias Móviles Simples (SMA)."""
-        self.df['sma_short'] = self.df['close'].rolling(window=SMA_SHORT_PERIOD).mean()
-        self.df['sma_long'] = self.df['close'].rolling(window=SMA_LONG_PERIOD).mean()
+        close = self.df['close'].to_numpy(dtype=np.float64)
+        self.df['sma_short'] = _sma(close, SMA_SHORT_PERIOD)
+        self.df['sma_long'] = _sma(close, SMA_LONG_PERIOD)
         logger.debug("SMA calculadas.")
 
     def _calculate_ema(self):
@@ -100,35 +192,36 @@ class MarketAnalyzer:
 
     def _calculate_bollinger_bands(self):
         """Calcula las Bandas de Bollinger."""
-        rolling_mean = self.df['close'].rolling(window=BB_PERIOD).mean()
-        rolling_std = self.df['close'].rolling(window=BB_PERIOD).std()
+        # Media y desviación salen de la misma vista de ventanas, sin copiar datos ni recorrer dos veces
+        close = self.df['close'].to_numpy(dtype=np.float64)
+        rolling_mean = np.full(len(close), np.nan)
+        rolling_std = np.full(len(close), np.nan)
+        if len(close) >= BB_PERIOD:
+            windows = sliding_window_view(close, BB_PERIOD)
+            rolling_mean[BB_PERIOD - 1:] = windows.mean(axis=1)
+            rolling_std[BB_PERIOD - 1:] = windows.std(axis=1, ddof=1)
         self.df['bb_upper'] = rolling_mean + (rolling_std * BB_STD_DEV)
         self.df['bb_lower'] = rolling_mean - (rolling_std * BB_STD_DEV)
         logger.debug("Bandas de Bollinger calculadas.")
 
     def _calculate_adx(self):
         """Calcula el Average Directional Index (ADX)."""
-        df = self.df.copy()
-        df['tr1'] = df['high'] - df['low']
-        df['tr2'] = (df['high'] - df['close'].shift()).abs()
-        df['tr3'] = (df['low'] - df['close'].shift()).abs()
-        df['tr'] = df[['tr1', 'tr2', 'tr3']].max(axis=1)
-
-        df['+dm'] = df['high'].diff()
-        df['-dm'] = -df['low'].diff()
-        df['+dm'] = df['+dm'].where((df['+dm'] > df['-dm']) & (df['+dm'] > 0), 0)
-        df['-dm'] = df['-dm'].where((df['-dm'] > df['+dm']) & (df['-dm'] > 0), 0)
-
-        df['tr_sum'] = df['tr'].rolling(window=ADX_PERIOD).sum()
-        df['+dm_sum'] = df['+dm'].rolling(window=ADX_PERIOD).sum()
-        df['-dm_sum'] = df['-dm'].rolling(window=ADX_PERIOD).sum()
-
-        df['+di'] = 100 * (df['+dm_sum'] / df['tr_sum'])
-        df['-di'] = 100 * (df['-dm_sum'] / df['tr_sum'])
-        df['dx'] = (abs(df['+di'] - df['-di']) / (df['+di'] + df['-di'])).fillna(0) * 100
-        df['adx'] = df['dx'].rolling(window=ADX_PERIOD).mean()
-
-        self.df['adx'] = df['adx']
+        # Columnas intermedias como series locales: no hace falta copiar todo el DataFrame
+        high, low, close = self.df['high'], self.df['low'], self.df['close']
+        prev_close = close.shift()
+        tr = pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+
+        plus_dm = high.diff()
+        minus_dm = -low.diff()
+        plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
+        minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
+
+        tr_sum = tr.rolling(window=ADX_PERIOD).sum()
+        plus_di = 100 * (plus_dm.rolling(window=ADX_PERIOD).sum() / tr_sum)
+        minus_di = 100 * (minus_dm.rolling(window=ADX_PERIOD).sum() / tr_sum)
+        dx = (abs(plus_di - minus_di) / (plus_di + minus_di)).fillna(0) * 100
+
+        self.df['adx'] = dx.rolling(window=ADX_PERIOD).mean()
         logger.debug("ADX calculado.")
 
     def _calculate_stochastic(self):
@@ -156,7 +249,7 @@ class MarketAnalyzer:
         :return: Precio de venta necesario.
         """
         sell_price = latest['close'] * (1 + profit_margin)
-        logger.debug(f"Precio de venta calculado: {sell_price}")
+        logger.debug("Precio de venta calculado: %s", sell_price)
         return sell_price
 
     def is_sell_price_valid(self, sell_price, safety_margin=0.855):
@@ -169,7 +262,10 @@ class MarketAnalyzer:
         """
         historical_max = self.df['close'].max()
         adjusted_max = historical_max * safety_margin
-        logger.info(f"Máximo histórico: {historical_max:.6f}, Máximo ajustado: {adjusted_max:.6f}, Precio de venta necesario: {sell_price:.6f}")
+        logger.info(
+            "Máximo histórico: %.6f, Máximo ajustado: %.6f, Precio de venta necesario: %.6f",
+            historical_max, adjusted_max, sell_price
+        )
         return sell_price <= adjusted_max
 
     def is_buy_signal(self):
@@ -192,7 +288,7 @@ class MarketAnalyzer:
                     recent = self.df.iloc[-BUBBLE_MOMENTUM_WINDOW:]
                     up_frac = (recent['close'] > recent['open']).mean()
                     if up_frac >= BUBBLE_MOMENTUM_THRESHOLD:
-                        logger.info(f"[{self.symbol}] Override burbuja por momentum: {up_frac:.2%} velas alcistas.")
+                        logger.info("[%s] Override burbuja por momentum: %.2f%% velas alcistas.", self.symbol, up_frac * 100)
                         self.bubble_override = True
                     else:
                         logger.warning(f"[{self.symbol}] No hay suficientes velas alcistas para override de burbuja: {up_frac:.2%} velas alcistas. Minimo {BUBBLE_MOMENTUM_THRESHOLD:.2%} velas alcistas.")
@@ -203,13 +299,7 @@ class MarketAnalyzer:
 
         score = 0
 
-        # Condiciones ajustadas
-        sma_condition = latest['sma_short'] > latest['sma_long']  # Cruce de SMA
-        rsi_condition = latest['rsi'] < BUY_THRESHOLD_RSI  # Sobreventa
-        macd_condition = latest['macd_hist'] > BUY_THRESHOLD_MACD  # Histograma MACD positivo
-        bb_condition = latest['close'] <= latest['bb_lower']  # En la banda inferior
-        adx_condition = latest['adx'] > BUY_THRESHOLD_ADX  # Tendencia fuerte
-        stochastic_condition = latest['stochastic'] < BUY_THRESHOLD_STOCHASTIC  # Sobreventa
+        sma_condition, rsi_condition, macd_condition, bb_condition, adx_condition, stochastic_condition = self.get_signals()
 
         # Sumar puntuaciones
         if sma_condition:
@@ -232,11 +322,11 @@ class MarketAnalyzer:
             logger.debug("Condición Oscilador Estocástico cumplida.")
 
         # if score >= 4:
-        logger.info(f"[{self.symbol}] Puntuación total: {score} (Umbral requerido: {MIN_SCORE})")
+        logger.info("[%s] Puntuación total: %s (Umbral requerido: %s)", self.symbol, score, MIN_SCORE)
 
         # Verificar si se cumple el MIN_SCORE
         if score >= MIN_SCORE:
-            logger.info(f"[{self.symbol}] Señal de compra detectada ({score} / {MIN_SCORE} puntos).")
+            logger.info("[%s] Señal de compra detectada (%s / %s puntos).", self.symbol, score, MIN_SCORE)
             # Calcular el precio de venta necesario
             sell_price = self.calculate_sell_price(latest)
             # Validar el precio de venta
@@ -246,7 +336,10 @@ class MarketAnalyzer:
             else:
                 # Marcar y descartar señal temporalmente
                 self.sell_price_invalid = True
-                logger.info(f"[{self.symbol}] Señal de compra descartada: El precio de venta necesario (${sell_price:.6f}) excede el máximo histórico ajustado.")
+                logger.info(
+                    "[%s] Señal de compra descartada: El precio de venta necesario ($%.6f) excede el máximo histórico ajustado.",
+                    self.symbol, sell_price
+                )
                 return False
         # No se cumplió el umbral de indicadores
         return False
@@ -259,10 +352,10 @@ class MarketAnalyzer:
         """
         try:
             if self.is_buy_signal():
-                logger.info(f"[{self.symbol}] Recomendación: Comprar.\n")
+                logger.info("[%s] Recomendación: Comprar.\n", self.symbol)
                 return True
             else:
-                logger.info(f"[{self.symbol}] Recomendación: No comprar.\n")
+                logger.info("[%s] Recomendación: No comprar.\n", self.symbol)
                 return False
         except Exception as e:
             logger.error(f"[{self.symbol}] Error en el análisis: {e}")
@@ -274,16 +367,21 @@ class MarketAnalyzer:
 
         :return: Tuple con el estado de cada condición.
         """
-        latest = self._latest()
-
-        sma_condition = latest['sma_short'] > latest['sma_long']
-        rsi_condition = latest['rsi'] < BUY_THRESHOLD_RSI
-        macd_condition = latest['macd_hist'] > BUY_THRESHOLD_MACD
-        bb_condition = latest['close'] <= latest['bb_lower']
-        adx_condition = latest['adx'] > BUY_THRESHOLD_ADX
-        stochastic_condition = latest['stochastic'] < BUY_THRESHOLD_STOCHASTIC
-
-        return sma_condition, rsi_condition, macd_condition, bb_condition, adx_condition, stochastic_condition
+        if self._signals is None:
+            # Leer la última fila directamente de los arrays NumPy de cada columna
+            last = {
+                col: self.df[col].to_numpy()[-1]
+                for col in ('close', 'sma_short', 'sma_long', 'rsi', 'macd_hist', 'bb_lower', 'adx', 'stochastic')
+            }
+            self._signals = (
+                last['sma_short'] > last['sma_long'],  # Cruce de SMA
+                last['rsi'] < BUY_THRESHOLD_RSI,  # Sobreventa
+                last['macd_hist'] > BUY_THRESHOLD_MACD,  # Histograma MACD positivo
+                last['close'] <= last['bb_lower'],  # En la banda inferior
+                last['adx'] > BUY_THRESHOLD_ADX,  # Tendencia fuerte
+                last['stochastic'] < BUY_THRESHOLD_STOCHASTIC  # Sobreventa
+            )
+        return self._signals
 
     def calculate_stop_loss(self, latest, percentage=0.02):
         """
@@ -3,17 +3,24 @@ from app.managers.trends_manager import TrendsManager
 from api.openai.client import OpenAIClient
 from api.news.newsapi.client import NewsAPIClient
 from utils.logger import setup_logger
+from utils.cache import TTLCache
+from utils.lazy import LazyProxy
 
 logger = setup_logger(__name__)
 
 class SentimentAnalyzer:
+    # Segundos durante los que se reutiliza el sentimiento calculado para una palabra clave
+    CACHE_TTL = 600
+
     def __init__(self, precision=1):
         """
         Inicializa el cliente SentimentAnalyzer.
         :param precision: Nivel de precisión (1 = TextBlob, 2 = TextBlob + OpenAI).
         """
-        self.openai_client = OpenAIClient()
+        # Solo se consulta con precision=2; se crea en el primer uso
+        self.openai_client = LazyProxy(OpenAIClient)
         self.precision = precision
+        self._cache = TTLCache(maxsize=512, ttl=self.CACHE_TTL)
 
     def get_overall_sentiment(self, keyword, limit = 100):
         """
@@ -21,6 +28,11 @@ class SentimentAnalyzer:
         :param keyword: Palabra clave para buscar tendencias.
         :return: Puntaje de sentimiento promedio.
         """
+        # Las noticias cambian en minutos: no repetir la descarga y el análisis en cada ciclo
+        cached = self._cache.get((keyword, limit))
+        if cached is not None:
+            return cached
+
         news_api_client = NewsAPIClient(page_size=limit)
         trends_manager = TrendsManager(news_client=news_api_client)
         articles = trends_manager.fetch_trends(keyword, limit=limit)
@@ -30,7 +42,9 @@ class SentimentAnalyzer:
         ]
 
         if sentiments:
-            return sum(sentiments) / len(sentiments)
+            score = sum(sentiments) / len(sentiments)
+            self._cache.set((keyword, limit), score)
+            return score
         else:
             logger.error("No se pudo analizar el sentimiento.")
             return 0
@@ -55,9 +55,8 @@ class TradeExecutor:
 
             # Ajustar posición para SELL MARKET según balance disponible
             if side == "SELL" and order_type.upper() == "MARKET":
-                balances = self.data_manager.get_balance_summary()
                 base_asset = symbol.replace("USDC", "")
-                free_qty = next((b['free'] for b in balances if b['asset'] == base_asset), 0.0)
+                free_qty = self.data_manager.get_free_balances().get(base_asset, 0.0)
                 if free_qty <= 0:
                     logger.error(f"No hay balance disponible de {base_asset} para vender.")
                     return False
@@ -1,9 +1,8 @@
+import threading
 import time
-from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Any, Tuple, Optional, Set
+from typing import List, Dict, Any, Tuple, Optional, Set, Iterator
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from prettytable import PrettyTable
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 
 from domain.ports import TradeDataProvider, TradeExecutorPort, BuyUseCase
 from app.analyzers.market_analyzer import MarketAnalyzer
@@ -25,6 +24,10 @@ class BuyManager(BuyUseCase):
     Gestor encargado de analizar y ejecutar compras de criptomonedas.
     """
 
+    # Separación mínima entre compras y entre páginas de histórico para no saturar la API
+    TRADE_PACING_SECONDS = 5
+    PAGINATION_PACING_SECONDS = 2
+
     def __init__(
         self,
         data_provider: TradeDataProvider,
@@ -35,7 +38,8 @@ class BuyManager(BuyUseCase):
         investment_calculator: InvestmentCalculator,
         sentiment_analyzer: SentimentAnalyzer,
         max_records: int = settings.MAX_RECORDS,
-        max_workers: int = settings.MAX_WORKERS
+        max_workers: int = settings.MAX_WORKERS,
+        stop_event: Optional[threading.Event] = None
     ):
         self.data_provider = data_provider
         self.executor = executor
@@ -45,9 +49,14 @@ class BuyManager(BuyUseCase):
         self.investment_calculator = investment_calculator
         self.sentiment_analyzer = sentiment_analyzer
         self.max_records = max_records
+        self.max_workers = max_workers
         self.thread_pool = ThreadPoolExecutor(max_workers=max_workers)
         # Símbolos sin histórico válido para excluir de futuros análisis
         self.failed_symbols: Set[str] = set()
+        # Momento (monotónico) de la última compra enviada
+        self._last_trade_at = 0.0
+        # Señal de parada compartida con TradeManager: corta la pasada de compra entre monedas y en las esperas
+        self._stop_event = stop_event or threading.Event()
         # Risk management
         self.risk_manager = RiskManager(data_provider, executor)
 
@@ -80,25 +89,28 @@ class BuyManager(BuyUseCase):
         max_time_range = interval_ms * self.max_records
 
         current_start = start_time
+        first_page = True
         while current_start < end_time:
             current_end = min(current_start + max_time_range, end_time)
 
             try:
+                # Respetar límites de la API solo entre páginas consecutivas
+                if not first_page and self._stop_event.wait(self.PAGINATION_PACING_SECONDS):
+                    break
+                first_page = False
                 data = self.data_provider.fetch_historical_data(
                     symbol, current_start, current_end, interval=interval
                 )
                 if not data:
-                    logging.debug(f"No se obtuvieron datos para {symbol} entre {current_start} y {current_end}.")
+                    logging.debug("No se obtuvieron datos para %s entre %s y %s.", symbol, current_start, current_end)
                     break
 
                 all_data.extend(data)
                 current_start = int(data[-1][6])
 
                 if len(data) < self.max_records:
-                    logging.debug(f"Datos insuficientes para continuar: {len(data)} registros obtenidos.")
+                    logging.debug("Datos insuficientes para continuar: %s registros obtenidos.", len(data))
                     break
-
-                time.sleep(2)  # Respetar límites de la API
             except Exception as e:
                 logging.error(f"Error al obtener datos para {symbol}: {e}")
                 break
@@ -116,10 +128,10 @@ class BuyManager(BuyUseCase):
         """
         symbol = coin.get('symbol')
         last_price = coin.get('lastPrice')
-        logging.info(f"[{symbol}] Recopilando datos históricos...")
+        logging.info("[%s] Recopilando datos históricos...", symbol)
         try:
             data = self.fetch_all_data(symbol, start_time, end_time)
-            logging.info(f"[{symbol}] Se han recopilado {len(data)} datos históricos.")
+            logging.info("[%s] Se han recopilado %s datos históricos.", symbol, len(data))
 
             if not data:
                 return symbol, None
@@ -147,16 +159,19 @@ class BuyManager(BuyUseCase):
             }
             # Si precio de venta inválido y no override de burbuja, intentar con rango doble
             if analysis['sell_price_invalid'] and not analysis['bubble_override']:
-                ext_hours = settings.DEFAULT_HISTORICAL_RANGE_HOURS * settings.DEFAULT_EXT_HISTORICAL_MULTIPLIER
+                ext_mult = settings.DEFAULT_EXT_HISTORICAL_MULTIPLIER
+                ext_hours = settings.DEFAULT_HISTORICAL_RANGE_HOURS * ext_mult
                 ext_days = ext_hours / 24
-                now = datetime.now(timezone.utc)
-                ext_start = int((now - timedelta(hours=ext_hours)).timestamp() * 1000)
+                ext_start = end_time - int(ext_hours * 3_600_000)
                 logging.info(
-                    f"{symbol}: precio objetivo inválido, probando rango extendido: {ext_days:.0f}d ({ext_hours}h) x{settings.DEFAULT_EXT_HISTORICAL_MULTIPLIER}"
+                    f"{symbol}: precio objetivo inválido, probando rango extendido: {ext_days:.0f}d ({ext_hours}h) x{ext_mult}"
                 )
                 data_ext = self.fetch_all_data(symbol, ext_start, end_time)
                 try:
-                    analyzer2 = MarketAnalyzer(data_ext, symbol)
+                    # Reutilizar indicadores del análisis inicial: solo se añaden las velas anteriores
+                    first_open = data[0][0]
+                    prefix_data_ext = [kline for kline in data_ext if kline[0] < first_open]
+                    analyzer2 = analyzer.extend(prefix_data_ext)
                     sell_price2 = analyzer2.calculate_sell_price(analyzer2._latest())
                     valid2 = analyzer2.is_sell_price_valid(sell_price2)
                     if valid2:
@@ -175,16 +190,34 @@ class BuyManager(BuyUseCase):
             logging.error(f"Error procesando {symbol}: {e}")
             return symbol, None
 
+    def has_available_funds(self) -> bool:
+        """
+        Comprueba si el saldo en USDC permite alguna compra en este ciclo.
+
+        La asignación máxima es max_pct del saldo y por debajo de INVESTMENT_AMOUNT la cantidad
+        a comprar es 0, así que sin ese mínimo ninguna moneda analizada llegaría a comprarse.
+        """
+        usdc_balance = self.data_provider.get_free_balances().get('USDC', 0.0)
+        required = self.quantity_calculator.investment_amount / self.investment_calculator.max_pct
+        if usdc_balance < required:
+            logging.info("Saldo USDC %.2f insuficiente para comprar (mínimo %.2f), omitiendo análisis.", usdc_balance, required)
+            return False
+        return True
+
     def analyze_and_execute_buys(self) -> None:
         """Orquesta el análisis técnico, filtra activos y decide compras."""
-        # Recolectar análisis técnico (usando self._process_coin y thread_pool como antes)
-        result: Dict[str, Dict[str, Any]] = {}
-
-        now = datetime.now(timezone.utc)
-        end_time = int(now.timestamp() * 1000)
-        start_time = int((now - timedelta(hours=settings.DEFAULT_HISTORICAL_RANGE_HOURS)).timestamp() * 1000)
+        # Sin fondos suficientes no tiene sentido descargar ni analizar velas
+        if not self.has_available_funds():
+            return
+        end_time = time.time_ns() // 1_000_000
+        start_time = end_time - settings.DEFAULT_HISTORICAL_RANGE_HOURS * 3_600_000
+        # Márgenes de stop-loss/take-profit constantes durante todo el ciclo
+        stop_pct = settings.STOP_LOSS_MARGIN / 100
+        take_pct = settings.PROFIT_MARGIN / 100
 
-        # Preparar todas las monedas para procesar
+        # Preparar todas las monedas para procesar, excluyendo ya los símbolos sin histórico previo
+        blacklist = frozenset(self.failed_symbols)
+        excluded = 0
         coins_to_process = []
         for cfg in BUY_CATEGORIES:
             method = getattr(self.data_provider, cfg['method'])
@@ -197,63 +230,110 @@ class BuyManager(BuyUseCase):
             limit = cfg.get('limit', 50)
             if len(coins) < limit:
                 logging.warning(f"Solo se obtuvieron {len(coins)} de {limit} para {cfg['name']}, rellenando con más populares")
-                
-            coins_to_process.extend(coins)
-        # Excluir símbolos con datos históricos fallidos previos
-        if self.failed_symbols:
-            original = len(coins_to_process)
-            coins_to_process = [c for c in coins_to_process if c['symbol'] not in self.failed_symbols]
-            logging.debug(f"Se excluyeron {original - len(coins_to_process)} símbolos sin histórico previo.")
+
+            allowed = [c for c in coins if c['symbol'] not in blacklist] if blacklist else coins
+            excluded += len(coins) - len(allowed)
+            coins_to_process.extend(allowed)
+        if excluded:
+            logging.debug(f"Se excluyeron {excluded} símbolos sin histórico previo.")
+
+        # Aplicar el filtro de activos con un único lote de precios antes de descargar velas
+        prices = self.data_provider.get_all_prices() if coins_to_process else {}
+        if prices:
+            tradable = set(self.asset_filter.filter([c['symbol'] for c in coins_to_process], prices))
+            coins_to_process = [c for c in coins_to_process if c['symbol'] in tradable]
         logging.info(f"Se recuperaron {len(coins_to_process)} monedas para análisis técnico.")
 
         if not coins_to_process:
             logging.info("No hay monedas para procesar en esta ejecución.")
             return
 
-        # Procesar cada moneda y actuar inmediatamente si hay señal
-        logging.info(f"Procesando {len(coins_to_process)} monedas secuencialmente para análisis técnico.\n")
-        for coin in coins_to_process:
-            symbol, analysis = self._process_coin(coin, start_time, end_time)
+        # Descargar y analizar en paralelo; decidir y actuar en este hilo según van terminando
+        logging.info(f"Procesando {len(coins_to_process)} monedas en paralelo para análisis técnico.\n")
+        for symbol, analysis in self._analyze_coins(coins_to_process, start_time, end_time):
+            if self._stop_event.is_set():
+                logging.info("Análisis de compra interrumpido por parada.")
+                break
             if not analysis:
                 logging.warning(f"No histórico para {symbol}. Se excluirá en siguientes iteraciones.\n")
                 self.failed_symbols.add(symbol)
                 continue
             if not analysis.get('trend'):
                 continue
-            # Filtrar el activo
-            if symbol not in self.asset_filter.filter([symbol]):
-                continue
-            # Obtener precio y saldo actual antes de cada decisión
+            # Un solo precio por candidato, compartido por filtro, cantidad y decisión
             current_price = self.data_provider.get_price(symbol)
-            usdc_balance = float(
-                next((b['free'] for b in self.data_provider.get_balance_summary() if b['asset'] == 'USDC'), 0.0)
-            )
+            if symbol not in self.asset_filter.filter([symbol], {symbol: current_price}):
+                continue
+            # Saldo actual antes de cada decisión (puede haber cambiado por compras previas)
+            balances = self.data_provider.get_free_balances()
+            usdc_balance = balances.get('USDC', 0.0)
             # Calcular asignación de capital según sentimiento
             sentiment_score = self.sentiment_analyzer.get_overall_sentiment(symbol.replace("USDC", ""))
             allocation = self.investment_calculator.calculate_size(usdc_balance, sentiment_score)
-            quantity = self.quantity_calculator.calculate(symbol, allocation)
+            quantity = self.quantity_calculator.calculate(symbol, allocation, current_price)
             if quantity <= 0:
-                logging.info(f"Cantidad a comprar 0 para {symbol} con allocation {allocation:.2f} USDC")
+                logging.info("Cantidad a comprar 0 para %s con allocation %.2f USDC", symbol, allocation)
                 continue
             indicators = analysis.get('indicators', {})
             should = self.decision_engine.should_buy(symbol, current_price, quantity, indicators)
             # Permitir compra si override de burbuja o precio override
             if analysis.get('bubble_override') or analysis.get('sell_price_override') or should:
                 # Verificar límites de exposición
-                if not self.risk_manager.can_open_position(current_price, quantity):
+                if not self.risk_manager.can_open_position(current_price, quantity, balances):
                     logging.warning(f"{symbol}: no abre posición, límite de exposición alcanzado")
                     continue
+                # Esperar solo lo que falte desde la última compra: el análisis ya solapa la pausa
+                if not self._wait_trade_pacing():
+                    logging.info("Análisis de compra interrumpido por parada.")
+                    break
                 # Ejecutar compra
                 self._make_action(symbol, current_price, quantity)
                 # Programar stop-loss/take-profit automáticos
-                stop_pct = settings.STOP_LOSS_MARGIN / 100
-                take_pct = settings.PROFIT_MARGIN / 100
                 self.risk_manager.apply_stop_take(symbol, current_price, stop_pct, take_pct)
                 # Registrar compra rápida si override de burbuja
                 if analysis.get('bubble_override'):
                     bubble_register(symbol)
-                # Esperar un poco para no saturar la API ni la cuenta
-                time.sleep(5)
+
+    def _analyze_coins(
+        self, coins: List[Dict[str, Any]], start_time: int, end_time: int
+    ) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Analiza las monedas en el thread_pool con como máximo max_workers tareas en vuelo,
+        devolviendo cada resultado según termina. Las monedas se envían a medida que se
+        liberan huecos, evitando encolar todo el ciclo y ráfagas contra los límites de la API.
+
+        :param coins: Monedas a analizar.
+        :param start_time: Tiempo de inicio para los datos históricos.
+        :param end_time: Tiempo de fin para los datos históricos.
+        :return: Iterador de tuplas (símbolo, análisis o None).
+        """
+        pending_coins = iter(coins)
+        in_flight: Set[Future] = set()
+        while True:
+            for coin in pending_coins:
+                if self._stop_event.is_set():
+                    break
+                in_flight.add(self.thread_pool.submit(self._process_coin, coin, start_time, end_time))
+                if len(in_flight) >= self.max_workers:
+                    break
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+    def _wait_trade_pacing(self) -> bool:
+        """
+        Bloquea únicamente el tiempo restante de TRADE_PACING_SECONDS desde la última compra,
+        de modo que el análisis de otras monedas cuente como parte de la espera.
+
+        :return: False si se pidió la parada durante la espera.
+        """
+        remaining = self.TRADE_PACING_SECONDS - (time.monotonic() - self._last_trade_at)
+        if remaining > 0 and self._stop_event.wait(remaining):
+            return False
+        self._last_trade_at = time.monotonic()
+        return True
 
     def _make_action(self, symbol: str, current_price: float, quantity_to_buy: float) -> None:
         trade_result = self.executor.execute_trade(
@@ -5,7 +5,7 @@ RiskManager: módulo para gestión de riesgos,
 - stop-loss / take-profit automáticos
 - tamaño de posición dinámico según % de capital
 """
-from typing import List
+from typing import Dict, List, Optional
 import numpy as np
 from config.settings import settings
 
@@ -22,9 +22,11 @@ class RiskManager:
         """
         Calcula el Value at Risk (VaR) a un nivel de confianza.
         """
-        sorted_r = sorted(returns)
-        index = int((1 - confidence) * len(sorted_r))
-        return abs(sorted_r[index]) if sorted_r else 0.0
+        if len(returns) == 0:
+            return 0.0
+        values = np.asarray(returns, dtype=np.float64)
+        index = int((1 - confidence) * len(values))
+        return float(abs(np.partition(values, index)[index]))
 
     def position_size(self, capital: float, stop_loss_pct: float) -> float:
         """
@@ -36,28 +38,33 @@ class RiskManager:
         # unidades a comprar
         return risk_amount / (loss_per_unit * capital) if loss_per_unit > 0 else 0
 
-    def current_exposure(self) -> float:
+    def current_exposure(self, balances: Optional[Dict[str, float]] = None) -> float:
         """
         Suma el valor en USD de todas las posiciones abiertas.
+
+        :param balances: Saldos libres indexados por activo; si no se indican se consultan.
         """
-        balances = self.data_provider.get_balance_summary()
+        if balances is None:
+            balances = self.data_provider.get_free_balances()
         total = 0.0
-        for b in balances:
-            asset = b['asset']
+        for asset, free in balances.items():
             if asset == 'USDC':
                 continue
-            free = float(b['free'])
             price = float(self.data_provider.get_price(asset + 'USDC'))
             total += free * price
         return total
 
-    def can_open_position(self, price: float, size: float) -> bool:
+    def can_open_position(self, price: float, size: float, balances: Optional[Dict[str, float]] = None) -> bool:
         """
         Verifica si abrir una posición mantiene el capital dentro del límite de exposición.
+
+        :param balances: Saldos libres indexados por activo; si no se indican se consultan una sola vez.
         """
-        capital = float(self.data_provider.get_balance('USDC'))
+        if balances is None:
+            balances = self.data_provider.get_free_balances()
+        capital = balances.get('USDC', 0.0)
         notional = price * size
-        return (self.current_exposure() + notional) <= (capital * self.max_exposure_pct)
+        return (self.current_exposure(balances) + notional) <= (capital * self.max_exposure_pct)
 
     def apply_stop_take(self, symbol: str, entry_price: float, stop_loss_pct: float, take_profit_pct: float):
         """
@@ -1,6 +1,13 @@
-import time
-from typing import List, Dict, Any
-from prettytable import PrettyTable
+import json
+import os
+import sys
+import threading
+from logging import INFO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Set
+import numpy as np
 
 from domain.ports import TradeDataProvider, TradeExecutorPort, SellUseCase
 from app.analyzers.sentiment_analyzer import SentimentAnalyzer
@@ -8,14 +15,32 @@ from utils.logger import setup_logger
 from app.services.price_calculator import PriceCalculator
 from app.services.sell_decision_engine import SellDecisionEngine
 from config.settings import settings
+from config.default import DEFAULT_SELL_MAX_CONCURRENT_ASSETS
+from utils.cache import TTLCache
 
 logging = setup_logger()
 
+
+@lru_cache(maxsize=1024)
+def _target_price(buy_price: float, buy_fee: float, sell_fee: float, profit_margin: float) -> float:
+    """
+    Precio objetivo por unidad que cubre comisiones y margen, memoizado: el precio medio de
+    una posición no cambia entre ciclos mientras no haya nuevas órdenes.
+    """
+    return buy_price * (1 + buy_fee) * (1 + profit_margin / 100) / (1 - sell_fee)
+
+
 class SellManager(SellUseCase):
     """
     Gestor encargado de analizar y ejecutar ventas de criptomonedas.
     """
 
+    # Activos analizados en paralelo como máximo (acota las peticiones simultáneas a Binance)
+    MAX_CONCURRENT_ASSETS = DEFAULT_SELL_MAX_CONCURRENT_ASSETS
+    # Validez (segundos) de precios e historial de órdenes cacheados entre ciclos cercanos
+    PRICE_CACHE_TTL = 5
+    ORDERS_CACHE_TTL = 60
+
     def __init__(
         self,
         data_provider: TradeDataProvider,
@@ -25,7 +50,8 @@ class SellManager(SellUseCase):
         decision_engine: SellDecisionEngine,
         profit_margin: float = settings.PROFIT_MARGIN,
         stop_loss_margin: float = settings.STOP_LOSS_MARGIN,
-        min_trade_usd: float = settings.MIN_TRADE_USD
+        min_trade_usd: float = settings.MIN_TRADE_USD,
+        trailing_highs_path: str = settings.TRAILING_HIGHS_PATH
     ):
         self.data_provider = data_provider
         self.executor = executor
@@ -35,21 +61,77 @@ class SellManager(SellUseCase):
         self.profit_margin = profit_margin
         self.stop_loss_margin = stop_loss_margin
         self.min_trade_usd = min_trade_usd
-        # Estado para trailing stop: máximo precio alcanzado por símbolo
-        self.trailing_highs: Dict[str, float] = {}
+        # Estado para trailing stop: máximo precio alcanzado por símbolo, persistido entre reinicios
+        self.trailing_highs_path = trailing_highs_path
+        self.trailing_highs: Dict[str, float] = self._load_trailing_highs()
+        # El motor decide el stop con su propio registro de máximos: compartir el persistido
+        self.decision_engine.trailing_highs = self.trailing_highs
+        self._highs_lock = threading.Lock()
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_ASSETS)
+        self._price_cache = TTLCache(maxsize=512, ttl=self.PRICE_CACHE_TTL)
+        self._orders_cache = TTLCache(maxsize=512, ttl=self.ORDERS_CACHE_TTL)
 
-    def show_portfolio(self, balances: List[Dict[str, Any]]) -> None:
+    def _load_trailing_highs(self) -> Dict[str, float]:
+        """
+        Recupera los máximos del trailing stop guardados en el último ciclo.
         """
-        Muestra el resumen del portafolio en una tabla.
+        try:
+            with open(self.trailing_highs_path, encoding="utf-8") as f:
+                return {symbol: float(high) for symbol, high in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"No se pudieron cargar los máximos del trailing stop: {e}")
+            return {}
 
-        :param balances: Lista de balances de activos.
+    def _save_trailing_highs(self, held: Set[str]) -> None:
         """
-        table = PrettyTable(["Activo", "Unidades disponibles"])
+        Guarda los máximos del trailing stop de las posiciones aún abiertas.
 
-        for balance in balances:
-            table.add_row([balance['asset'], balance['free']])
+        :param held: Símbolos en cartera en este ciclo; el resto se descarta para que una
+                     nueva compra del mismo activo no herede el máximo de la posición anterior.
+        """
+        with self._highs_lock:
+            # Podar en el sitio: el motor de decisión mantiene una referencia al mismo dict
+            for symbol in [s for s in self.trailing_highs if s not in held]:
+                del self.trailing_highs[symbol]
+            snapshot = dict(self.trailing_highs)
+        tmp_path = f"{self.trailing_highs_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            # Reemplazo atómico: un corte a mitad de escritura no deja el fichero corrupto
+            os.replace(tmp_path, self.trailing_highs_path)
+        except OSError as e:
+            logging.warning(f"No se pudieron guardar los máximos del trailing stop: {e}")
 
-        print(f"{table}\n")
+    def _cached_price(self, symbol: str) -> Optional[float]:
+        """
+        Obtiene el precio actual reutilizando el de los últimos PRICE_CACHE_TTL segundos.
+        """
+        return self._price_cache.get_or_set(symbol, lambda: self.data_provider.get_price(symbol))
+
+    def _cached_orders(self, symbol: str, balance: float) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtiene el historial de órdenes reutilizando el de los últimos ORDERS_CACHE_TTL segundos.
+        La clave incluye el saldo: cualquier compra o venta que lo modifique fuerza una nueva
+        consulta, y además se invalida explícitamente tras cada venta ejecutada.
+        """
+        return self._orders_cache.get_or_set(
+            (symbol, balance), lambda: self.data_provider.get_all_orders(symbol)
+        )
+
+    def show_portfolio(self, balances: List[Dict[str, Any]]) -> None:
+        """
+        Muestra el resumen del portafolio en una tabla de texto.
+
+        :param balances: Lista de balances de activos.
+        """
+        # Omitir el render sin terminal (ejecución desatendida) o si el nivel de log no muestra información
+        if not sys.stdout.isatty() or not logging.isEnabledFor(INFO):
+            return
+        rows = [f"{balance['asset']:<10} {balance['free']:>20}" for balance in balances]
+        print("\n".join(["Activo     Unidades disponibles", "-" * 31, *rows, ""]))
 
     def calculate_target_price(
         self, buy_price: float, buy_fee: float, sell_fee: float, quantity: float, profit_margin: float
@@ -64,9 +146,8 @@ class SellManager(SellUseCase):
         :param profit_margin: Margen de beneficio deseado en porcentaje.
         :return: Precio objetivo por unidad.
         """
-        total_cost = (buy_price * quantity) * (1 + buy_fee)
-        target_price = (total_cost * (1 + profit_margin / 100)) / (quantity * (1 - sell_fee))
-        return target_price
+        # La cantidad se cancela: el objetivo solo depende del precio medio, comisiones y margen
+        return _target_price(buy_price, buy_fee, sell_fee, profit_margin)
 
     def _get_average_buy_price(
         self, buy_orders: List[Dict[str, Any]], sell_orders: List[Dict[str, Any]], real_balance: float
@@ -79,123 +160,165 @@ class SellManager(SellUseCase):
         :param real_balance: Saldo real después de compras y ventas.
         :return: Precio promedio de compra.
         """
-        total_bought = sum(float(order['executedQty']) for order in buy_orders)
-        total_sold = sum(float(order['executedQty']) for order in sell_orders)
+        buys = np.array(
+            [(order['executedQty'], order['price'], order['cummulativeQuoteQty']) for order in buy_orders],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        qty, price, quote = buys[:, 0], buys[:, 1], buys[:, 2]
+        total_bought = qty.sum()
+        total_sold = np.array([order['executedQty'] for order in sell_orders], dtype=np.float64).sum()
         real_balance = total_bought - total_sold
 
-        valid_buy_orders = []
-        for order in buy_orders:
-            qty = float(order['executedQty'])
-            if qty > 0:
-                price = float(order['price']) if float(order['price']) > 0 else float(order['cummulativeQuoteQty']) / qty
-                valid_buy_orders.append({'qty': qty, 'price': price})
-
-        if valid_buy_orders and real_balance > 0:
-            last_buy_order = valid_buy_orders[-1]
-            if real_balance == last_buy_order['qty']:
-                return last_buy_order['price']
-            else:
-                total_spent = sum(order['qty'] * order['price'] for order in valid_buy_orders)
-                return total_spent / total_bought if total_bought > 0 else 0.0
-        elif len(valid_buy_orders) == 1:
-            return valid_buy_orders[0]['price']
-        else:
-            total_spent = sum(order['qty'] * order['price'] for order in valid_buy_orders)
-            return total_spent / total_bought if total_bought > 0 else 0.0
+        # Órdenes con cantidad ejecutada; si no tienen precio (MARKET) se usa importe / cantidad
+        valid = qty > 0
+        valid_qty = qty[valid]
+        valid_price = np.where(price[valid] > 0, price[valid], quote[valid] / valid_qty)
+
+        if valid_qty.size and real_balance > 0 and real_balance == valid_qty[-1]:
+            return float(valid_price[-1])
+        if valid_qty.size == 1 and real_balance <= 0:
+            return float(valid_price[0])
+        total_spent = (valid_qty * valid_price).sum()
+        return float(total_spent / total_bought) if total_bought > 0 else 0.0
 
     def analyze_and_execute_sells(self) -> None:
         """
         Analiza la cartera para determinar si es un buen momento para vender criptomonedas y ejecuta las ventas.
         """
+        # Precios y saldos son independientes: pedir los precios mientras llega el resumen de cuenta
+        prices_future = self.thread_pool.submit(self.data_provider.get_all_prices)
         balances = self.data_provider.get_balance_summary()
-        usdc_balance = float(next((item['free'] for item in balances if item['asset'] == 'USDC'), 0.0))
-        assets = [balance for balance in balances if balance['asset'] != 'USDC' and float(balance['free']) > 1]
-        sorted_assets = sorted(assets, key=lambda x: float(x['free']), reverse=True)
+        # Los saldos ya llegan como float desde el cliente de cuenta
+        assets = [balance for balance in balances if balance['asset'] != 'USDC' and balance['free'] > 1]
+        sorted_assets = sorted(assets, key=itemgetter('free'), reverse=True)
 
         self.show_portfolio(sorted_assets)
 
+        # Venta rápida si fue compra bajo override de burbuja (se consulta una vez por ciclo)
+        from app.utils.bubble_registry import get_and_clear_all
+        quick_syms = get_and_clear_all()
+
+        # Una sola petición con todos los precios en lugar de una por activo
+        prices = prices_future.result() or {}
+
+        # Descartar el polvo antes de pedir su historial de órdenes; sin precio en el lote se analiza igual
+        tradable_assets = []
         for asset in sorted_assets:
-            try:
-                symbol = f"{asset['asset']}USDC"
-                asset_orders = self.data_provider.get_all_orders(symbol)
-                # Venta rápida si fue compra bajo override de burbuja
-                from app.utils.bubble_registry import get_and_clear_all
-                quick_syms = get_and_clear_all()
-                if symbol in quick_syms:
-                    logging.info(f"Venta rápida por bubble_override para {symbol}.")
-                    current_price = float(self.data_provider.get_price(symbol))
-                    real_balance = float(asset['free'])
-                    # Forzar venta de todas las posiciones
-                    self.executor.execute_trade('SELL', symbol, 'MARKET', real_balance, reason='BUBBLE_QUICK_SELL')
-                    continue
-
-                if not asset_orders:
-                    logging.info(f"No se encontraron órdenes para {symbol}.")
-                    continue
-
-                buy_orders = [o for o in asset_orders if o['side'] == 'BUY']
-                sell_orders = [o for o in asset_orders if o['side'] == 'SELL']
-                real_balance = float(asset['free'])
-
-                if real_balance <= 0:
-                    logging.debug(f"Saldo real para {symbol} es {real_balance}, omitiendo.")
-                    continue
-
-                average_buy_price = self._get_average_buy_price(buy_orders, sell_orders, real_balance)
-                if average_buy_price == 0.0:
-                    logging.warning(f"No se pudo calcular el precio promedio de compra para {symbol}.")
-                    continue
-
-                target_price = self.calculate_target_price(
-                    buy_price=average_buy_price,
-                    buy_fee=0.001,
-                    sell_fee=0.001,
-                    quantity=real_balance,
-                    profit_margin=self.profit_margin
-                )
-                current_price = self.data_provider.get_price(symbol)
+            symbol = f"{asset['asset']}USDC"
+            price = prices.get(symbol)
+            if symbol in quick_syms or price is None or price * asset['free'] >= self.min_trade_usd:
+                tradable_assets.append(asset)
+            else:
+                logging.debug("%s por debajo del mínimo de %s USD, omitiendo.", symbol, self.min_trade_usd)
+        sorted_assets = tradable_assets
+
+        # Analizar todos los activos en paralelo; el pool acota las peticiones simultáneas
+        list(self.thread_pool.map(lambda asset: self._process_asset(asset, quick_syms, prices), sorted_assets))
+
+        # Un único volcado por ciclo, tras actualizar todos los máximos (sin saldos no se poda nada)
+        if balances:
+            self._save_trailing_highs({f"{b['asset']}USDC" for b in balances if b['free'] > 0})
+
+    def _process_asset(self, asset: Dict[str, Any], quick_syms: Set[str], prices: Dict[str, float]) -> None:
+        """
+        Analiza un activo de la cartera y ejecuta la venta si procede.
+
+        :param asset: Balance del activo.
+        :param quick_syms: Símbolos comprados bajo override de burbuja a vender de inmediato.
+        :param prices: Precios actuales por símbolo obtenidos al inicio del ciclo.
+        """
+        symbol = f"{asset['asset']}USDC"
+        try:
+            if symbol in quick_syms:
+                logging.info("Venta rápida por bubble_override para %s.", symbol)
+                real_balance = asset['free']
+                # Forzar venta de todas las posiciones
+                if self.executor.execute_trade('SELL', symbol, 'MARKET', real_balance, reason='BUBBLE_QUICK_SELL'):
+                    self._orders_cache.pop((symbol, real_balance))
+                return
+
+            asset_orders = self._cached_orders(symbol, asset['free'])
 
-                # Actualizar máximo histórico intra-trade para trailing stop
+            if not asset_orders:
+                logging.info("No se encontraron órdenes para %s.", symbol)
+                return
+
+            # Separar compras y ventas en una sola pasada
+            buy_orders: List[Dict[str, Any]] = []
+            sell_orders: List[Dict[str, Any]] = []
+            for order in asset_orders:
+                if order['side'] == 'BUY':
+                    buy_orders.append(order)
+                elif order['side'] == 'SELL':
+                    sell_orders.append(order)
+            real_balance = asset['free']
+
+            if real_balance <= 0:
+                logging.debug("Saldo real para %s es %s, omitiendo.", symbol, real_balance)
+                return
+
+            average_buy_price = self._get_average_buy_price(buy_orders, sell_orders, real_balance)
+            if average_buy_price == 0.0:
+                logging.warning(f"No se pudo calcular el precio promedio de compra para {symbol}.")
+                return
+
+            target_price = self.calculate_target_price(
+                buy_price=average_buy_price,
+                buy_fee=0.001,
+                sell_fee=0.001,
+                quantity=real_balance,
+                profit_margin=self.profit_margin
+            )
+            current_price = prices.get(symbol) or self._cached_price(symbol)
+
+            # Actualizar máximo histórico intra-trade para trailing stop
+            with self._highs_lock:
                 prev_high = self.trailing_highs.get(symbol, average_buy_price)
-                self.trailing_highs[symbol] = max(prev_high, current_price)
-                trailing_stop_price = self.trailing_highs[symbol] * (1 - (self.stop_loss_margin / 100))
-                stop_loss_price = trailing_stop_price
+                trailing_high = max(prev_high, current_price)
+                self.trailing_highs[symbol] = trailing_high
+            trailing_stop_price = trailing_high * (1 - (self.stop_loss_margin / 100))
+            stop_loss_price = trailing_stop_price
 
-                # Calcular porcentaje de ganancia o pérdida
-                percentage_gain = ((current_price - average_buy_price) / average_buy_price) * 100
-                percentage_loss = ((average_buy_price - current_price) / average_buy_price) * 100
+            # Calcular porcentaje de ganancia o pérdida
+            percentage_gain = ((current_price - average_buy_price) / average_buy_price) * 100
 
-                logging.info(f"Asset: {asset['asset']}")
-                logging.info(f"Precio Actual: ${current_price:,.8f}")
-                logging.info(f"Posiciones abiertas: {real_balance:,.2f}")
-                logging.info(f"Precio máximo alcanzado: {self.trailing_highs[symbol]:.8f}")
-                logging.info(f"Precio Promedio de Compra: ${average_buy_price:,.8f}")
-                logging.info(f"Precio Objetivo de Venta: ${target_price:,.8f}")
-                logging.info(f"Precio de Stop Loss: ${stop_loss_price:,.8f}")
-                logging.info(f"Porcentaje de Ganancia: {percentage_gain:.2f}%\n")
-                # logging.info(f"Porcentaje de Pérdida: {percentage_loss:.2f}%")
-
-                if current_price * real_balance < self.min_trade_usd:
-                    logging.info(f"Operación menor a mínimo {self.min_trade_usd} USD, omitiendo.")
-                    continue
-                decision = self.decision_engine.decide(asset, average_buy_price, current_price, real_balance)
-                # Evitar ventas por target si la ganancia neta es inferior al umbral configurado
-                if decision == "vender ganancia" and percentage_gain < self.profit_margin:
-                    logging.info(f"[{symbol}] Ganancia {percentage_gain:.2f}% menor al objetivo {self.profit_margin}%, omitiendo venta para cubrir comisiones.")
-                    continue
-                if decision != "mantener":
-                    self._make_action(decision, symbol, average_buy_price, current_price, real_balance, percentage_gain, percentage_loss)
-
-                # Opcional: espera entre cada operación para evitar sobrecargar la API
-                time.sleep(2)
+            # Un único registro por activo para que no se entremezcle con otros hilos
+            logging.info(
+                "Asset: %s\n"
+                "Precio Actual: $%.8f\n"
+                "Posiciones abiertas: %.2f\n"
+                "Precio máximo alcanzado: %.8f\n"
+                "Precio Promedio de Compra: $%.8f\n"
+                "Precio Objetivo de Venta: $%.8f\n"
+                "Precio de Stop Loss: $%.8f\n"
+                "Porcentaje de Ganancia: %.2f%%\n",
+                asset['asset'], current_price, real_balance, trailing_high,
+                average_buy_price, target_price, stop_loss_price, percentage_gain
+            )
 
-            except Exception as e:
-                logging.error(f"Error al procesar la venta para {symbol}: {e}")
-    
-    def _make_action(self, action, symbol, average_buy_price, current_price, real_balance, percentage_gain, percentage_loss):
+            if current_price * real_balance < self.min_trade_usd:
+                logging.info("Operación menor a mínimo %s USD, omitiendo.", self.min_trade_usd)
+                return
+            decision = self.decision_engine.decide(asset, average_buy_price, current_price, real_balance)
+            # Evitar ventas por target si la ganancia neta es inferior al umbral configurado
+            if decision == "vender ganancia" and percentage_gain < self.profit_margin:
+                logging.info(
+                    "[%s] Ganancia %.2f%% menor al objetivo %s%%, omitiendo venta para cubrir comisiones.",
+                    symbol, percentage_gain, self.profit_margin
+                )
+                return
+            if decision != "mantener":
+                self._make_action(decision, symbol, average_buy_price, current_price, real_balance, percentage_gain, None)
+
+        except Exception as e:
+            logging.error(f"Error al procesar la venta para {symbol}: {e}")
+
+    def _make_action(self, action, symbol, average_buy_price, current_price, real_balance, percentage_gain, percentage_loss=None):
         if action == "vender pérdida":
-            percentage_loss = ((average_buy_price - current_price) / average_buy_price) * 100
-            logging.info(f"Stop loss alcanzado. Vender para limitar pérdidas. -{percentage_loss:,.2f}%.\n")
+            # Solo esta rama necesita la pérdida; se calcula aquí en lugar de para cada activo
+            if percentage_loss is None:
+                percentage_loss = ((average_buy_price - current_price) / average_buy_price) * 100
+            logging.info("Stop loss alcanzado. Vender para limitar pérdidas. -%.2f%%.\n", percentage_loss)
 
             try:
                 trade_result = self.executor.execute_trade(
@@ -207,13 +330,14 @@ class SellManager(SellUseCase):
                     percentage_gain=-percentage_loss
                 )
                 if trade_result:
-                    logging.info(f"Orden de venta por stop loss ejecutada para {symbol}.\n")
+                    self._orders_cache.pop((symbol, real_balance))
+                    logging.info("Orden de venta por stop loss ejecutada para %s.\n", symbol)
                 else:
                     logging.error(f"Orden de venta por stop loss no se ha podido ejecutar para {symbol}.\n")
             except Exception as e:
                 logging.error(f"Error al ejecutar la venta por stop loss para {symbol}: {e}")
         elif action == "vender ganancia":
-            logging.info(f"Objetivo de ganancia alcanzado. Vender para asegurar ganancias. +{percentage_gain:,.2f}%.\n")
+            logging.info("Objetivo de ganancia alcanzado. Vender para asegurar ganancias. +%.2f%%.\n", percentage_gain)
 
             try:
                 trade_result = self.executor.execute_trade(
@@ -225,7 +349,8 @@ class SellManager(SellUseCase):
                     percentage_gain=percentage_gain
                 )
                 if trade_result:
-                    logging.info(f"Orden de venta por objetivo de ganancia ejecutada para {symbol}.\n")
+                    self._orders_cache.pop((symbol, real_balance))
+                    logging.info("Orden de venta por objetivo de ganancia ejecutada para %s.\n", symbol)
                 else:
                     logging.error(f"Orden de venta por objetivo de ganancia no se ha podido ejecutar para {symbol}.\n")
             except Exception as e:
@@ -1,4 +1,7 @@
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional
 from utils.logger import setup_logger
 
 from api.binance.data_manager import BinanceDataManager
@@ -11,6 +14,7 @@ from app.managers.buy_manager import BuyManager
 from app.managers.sell_manager import SellManager
 from app.notifiers.telegram_notifier import TelegramNotifier
 from config.settings import settings
+from utils.lazy import LazyProxy
 from app.services.asset_filter import AssetFilter
 from app.services.quantity_calculator import QuantityCalculator
 from app.services.buy_decision_engine import BuyDecisionEngine
@@ -57,15 +61,22 @@ class TradeManager:
         self.data_manager = BinanceDataManager()
         self.notifier = TelegramNotifier()
         self.executor = TradeExecutor()
-        self.openai_client = OpenAIClient()
+        # Solo se usan al consultar a OpenAI: crearlos en el primer uso evita exigir la clave de OpenAI
+        # y descargar el listado de monedas de CoinGecko al arrancar cuando USE_OPEN_AI_API está desactivado
+        self.openai_client = LazyProxy(OpenAIClient)
         self.sentiment_analyzer = SentimentAnalyzer()
-        self.coin_gecko_client = CoinGeckoClient()
+        self.coin_gecko_client = LazyProxy(CoinGeckoClient)
         self.profit_margin = profit_margin
         self.stop_loss_margin = stop_loss_margin
         self.sleep_interval = sleep_interval
         self.investment_amount = investment_amount
         self.use_open_ai_api = use_open_ai_api
         self.running = False
+        # Despierta las esperas entre ciclos en cuanto se llama a stop()
+        self._stop_event = threading.Event()
+        # Las compras corren en un único hilo de fondo para no retrasar el escaneo de ventas
+        self._buy_pool: Optional[ThreadPoolExecutor] = None
+        self._buy_future: Optional[Future] = None
 
         # Inicializar componentes de compra
         asset_filter = AssetFilter(self.data_manager, settings)
@@ -86,7 +97,8 @@ class TradeManager:
             investment_calculator=investment_calculator,
             sentiment_analyzer=self.sentiment_analyzer,
             max_records=max_records,
-            max_workers=max_workers
+            max_workers=max_workers,
+            stop_event=self._stop_event
         )
 
         # Inicializar componentes de venta
@@ -115,19 +127,28 @@ class TradeManager:
         Inicia la automatización secuencial de ventas y compras.
         """
         self.running = True
+        self._stop_event.clear()
+        if self._buy_pool is None:
+            self._buy_pool = ThreadPoolExecutor(max_workers=1)
+        buy_pool = self._buy_pool
         logging.info("Inicio de la automatización secuencial de ventas y compras.")
         logging.info("Condiciones de mercado favorables. Iniciando automatización secuencial.\n\n")
         try:
             while self.running:
-                # Primero ejecutar ventas, luego compras
+                cycle_start = time.monotonic()
+                # Ventas en cada ciclo; las compras en segundo plano, sin solaparse entre sí
                 try:
                     self.sell_manager.analyze_and_execute_sells()
                 except Exception as e:
                     logging.error(f"Error en análisis de venta: {e}")
-                try:
-                    self.buy_manager.analyze_and_execute_buys()
-                except Exception as e:
-                    logging.error(f"Error en análisis de compra: {e}")
+                if self._buy_future is None or self._buy_future.done():
+                    try:
+                        self._buy_future = buy_pool.submit(self._run_buys)
+                    except RuntimeError:
+                        # stop() cerró el pool durante el escaneo de ventas
+                        break
+                else:
+                    logging.warning("El análisis de compra anterior sigue en curso; se omite en este ciclo.")
                 # # Ejecutar estrategias pluginizadas
                 # for strat in self.strategies:
                 #     try:
@@ -149,16 +170,35 @@ class TradeManager:
                 #             )
                 #     except Exception as e:
                 #         logging.error(f"Error en estrategia {strat.name()}: {e}")
-                time.sleep(self.sleep_interval)
+                # Cadencia fija: descontar lo que ya duró el escaneo en lugar de dormir siempre el intervalo completo
+                elapsed = time.monotonic() - cycle_start
+                if elapsed >= self.sleep_interval:
+                    logging.debug("El ciclo duró %.1fs, más que el intervalo de %ss; sin espera.", elapsed, self.sleep_interval)
+                if self._stop_event.wait(max(0.0, self.sleep_interval - elapsed)):
+                    break
         except KeyboardInterrupt:
             self.stop()
             logging.info("Automatización secuencial detenida por el usuario.")
 
+    def _run_buys(self) -> None:
+        """
+        Ejecuta un análisis de compra completo; pensado para el hilo de fondo de run().
+        """
+        try:
+            self.buy_manager.analyze_and_execute_buys()
+        except Exception as e:
+            logging.error(f"Error en análisis de compra: {e}")
+
     def stop(self) -> None:
         """
         Detiene la automatización combinada.
         """
         self.running = False
+        self._stop_event.set()
+        # Descarta la pasada pendiente; la que está en curso ve _stop_event y termina en la siguiente comprobación
+        if self._buy_pool is not None:
+            self._buy_pool.shutdown(wait=False, cancel_futures=True)
+            self._buy_pool = None
         logging.info("TradeManager detenido por señal externa.")
 
     def _buy_loop(self) -> None:
@@ -170,7 +210,8 @@ class TradeManager:
                 self.buy_manager.analyze_and_execute_buys()
             except Exception as e:
                 logging.error(f"Error en buy loop: {e}")
-            time.sleep(self.sleep_interval)
+            if self._stop_event.wait(self.sleep_interval):
+                break
 
     def _sell_loop(self) -> None:
         """
@@ -181,4 +222,5 @@ class TradeManager:
                 self.sell_manager.analyze_and_execute_sells()
             except Exception as e:
                 logging.error(f"Error en sell loop: {e}")
-            time.sleep(self.sleep_interval)
+            if self._stop_event.wait(self.sleep_interval):
+                break
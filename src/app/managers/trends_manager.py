@@ -1,20 +1,34 @@
-from typing import List, Dict, Any
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
 from utils.logger import setup_logger
+from utils.cache import TTLCache
+from utils.json_utils import json_dumps
 from domain.ports import TrendsUseCase, NewsProvider, SocialMediaProvider
 
 logger = setup_logger(__name__)
 
+# Sustituto compartido de solo lectura para publicaciones sin "data"
+_EMPTY: Dict[str, Any] = {}
+
+# Hilos de larga vida para consultar Reddit mientras se descargan las noticias
+_FETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="trends")
+
 class TrendsManager(TrendsUseCase):
     """
     Gestiona la recuperación y combinación de tendencias desde múltiples fuentes.
     """
-    
-    def __init__(self, news_client: NewsProvider, reddit_client: SocialMediaProvider):
+    # Segundos durante los que se reutilizan los resultados de cada fuente para una palabra clave
+    CACHE_TTL = 300
+    # Compartida entre instancias: SentimentAnalyzer crea un TrendsManager por consulta
+    _cache = TTLCache(maxsize=512, ttl=CACHE_TTL)
+
+    def __init__(self, news_client: NewsProvider, reddit_client: Optional[SocialMediaProvider] = None):
         """
         Inicializa el gestor de tendencias con clientes para las fuentes.
 
         :param news_client: Instancia de NewsProvider.
-        :param reddit_client: Instancia de SocialMediaProvider.
+        :param reddit_client: Instancia de SocialMediaProvider (opcional; sin ella solo se usa NewsAPI).
         """
         self.news_client = news_client
         self.reddit_client = reddit_client
@@ -27,26 +41,49 @@ class TrendsManager(TrendsUseCase):
         :return: Lista combinada de datos de diferentes fuentes con estructura uniforme.
         """
         combined_data = []
-        
+        # Cada fuente se cachea por separado: un fallo de una no descarta lo obtenido de la otra
+        news_key = ("news", keyword.lower(), limit)
+        reddit_key = ("reddit", keyword.lower(), limit)
+        formatted_news = self._cache.get(news_key)
+        formatted_reddit = self._cache.get(reddit_key) if self.reddit_client is not None else None
+        logger.debug(
+            "Cache de tendencias para '%s': news=%s, reddit=%s",
+            keyword, "hit" if formatted_news is not None else "miss", "hit" if formatted_reddit is not None else "miss"
+        )
+
+        # Las dos fuentes son independientes: Reddit se consulta en segundo plano mientras llegan las noticias
+        reddit_future = (
+            _FETCH_POOL.submit(self.reddit_client.fetch_posts, keyword, limit=limit)
+            if self.reddit_client is not None and formatted_reddit is None else None
+        )
+
         # Recuperar y procesar noticias de NewsAPI
-        try:
-            news_articles = self.news_client.fetch_articles(keyword)
-            logger.info(f"NewsAPI: Se recuperaron {len(news_articles)} artículos relacionados con '{keyword}'.")
-            formatted_news = self._format_news(news_articles)
+        if formatted_news is None:
+            try:
+                news_articles = self.news_client.fetch_articles(keyword)
+                logger.info(f"NewsAPI: Se recuperaron {len(news_articles)} artículos relacionados con '{keyword}'.")
+                formatted_news = self._format_news(news_articles)
+                self._cache.set(news_key, formatted_news)
+            except Exception as e:
+                logger.error(f"Error al recuperar artículos de NewsAPI para '{keyword}': {e}")
+        if formatted_news:
             combined_data.extend(formatted_news)
-        except Exception as e:
-            logger.error(f"Error al recuperar artículos de NewsAPI para '{keyword}': {e}")
 
         # Recuperar y procesar publicaciones de Reddit
-        try:
-            reddit_posts = self.reddit_client.fetch_posts(keyword, limit=limit)
-            logger.info(f"Reddit: Se recuperaron {len(reddit_posts)} publicaciones relacionadas con '{keyword}'.")
-            formatted_reddit = self._format_reddit(reddit_posts)
+        if reddit_future is not None:
+            try:
+                reddit_posts = reddit_future.result()
+                logger.info(f"Reddit: Se recuperaron {len(reddit_posts)} publicaciones relacionadas con '{keyword}'.")
+                formatted_reddit = self._format_reddit(reddit_posts)
+                self._cache.set(reddit_key, formatted_reddit)
+            except Exception as e:
+                logger.error(f"Error al recuperar publicaciones de Reddit para '{keyword}': {e}")
+        if formatted_reddit:
             combined_data.extend(formatted_reddit)
-        except Exception as e:
-            logger.error(f"Error al recuperar publicaciones de Reddit para '{keyword}': {e}")
 
-        logger.debug(f"Datos combinados para '{keyword}': {combined_data}")
+        # La lista completa solo se serializa si DEBUG está activo; en JSON, que además escapa saltos de línea
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Datos combinados para '%s': %s", keyword, json_dumps(combined_data))
         return combined_data
 
     @staticmethod
@@ -57,15 +94,17 @@ class TrendsManager(TrendsUseCase):
         :param articles: Lista de artículos de NewsAPI.
         :return: Lista de artículos formateados.
         """
-        return [
-            {
-                "title": article.get("title", "Sin título"),
-                "description": article.get("description", "Sin descripción"),
-                "content": article.get("content") or article.get("description", ""),
+        formatted = []
+        append = formatted.append
+        for article in articles:
+            get = article.get
+            append({
+                "title": get("title", "Sin título"),
+                "description": get("description", "Sin descripción"),
+                "content": get("content") or get("description", ""),
                 "source": "NewsAPI"
-            }
-            for article in articles
-        ]
+            })
+        return formatted
 
     @staticmethod
     def _format_reddit(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -75,12 +114,16 @@ class TrendsManager(TrendsUseCase):
         :param posts: Lista de publicaciones de Reddit.
         :return: Lista de publicaciones formateadas.
         """
-        return [
-            {
-                "title": post.get("data", {}).get("title", "Sin título"),
-                "description": (post.get("data", {}).get("selftext", "")[:150] + "...") if post.get("data", {}).get("selftext") else "Sin descripción",
-                "content": post.get("data", {}).get("selftext", ""),
+        formatted = []
+        append = formatted.append
+        for post in posts:
+            # Un único acceso a "data" por publicación, sin crear un dict vacío en cada consulta
+            data = post.get("data") or _EMPTY
+            selftext = data.get("selftext", "")
+            append({
+                "title": data.get("title", "Sin título"),
+                "description": (selftext[:150] + "...") if selftext else "Sin descripción",
+                "content": selftext,
                 "source": "Reddit"
-            }
-            for post in posts
-        ]
+            })
+        return formatted
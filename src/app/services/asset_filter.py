@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from domain.ports import TradeDataProvider
 from config.settings import Settings
 
@@ -10,12 +10,15 @@ class AssetFilter:
         self.data_provider = data_provider
         self.max_price = settings.MAX_BUY_PRICE
 
-    def filter(self, symbols: List[str]) -> List[str]:
+    def filter(self, symbols: List[str], prices: Optional[Dict[str, float]] = None) -> List[str]:
+        """
+        :param prices: Precios ya obtenidos por símbolo; si se pasan no se vuelven a pedir.
+        """
         valid = []
         for symbol in symbols:
             if symbol in ("USDCUSDC", "USDCUSDC"):
                 continue
-            price = self.data_provider.get_price(symbol)
+            price = prices.get(symbol) if prices is not None else self.data_provider.get_price(symbol)
             if price is None or price >= self.max_price:
                 continue
             valid.append(symbol)
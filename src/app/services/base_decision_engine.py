@@ -1,11 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional, Dict, Any
 from api.openai.client import OpenAIClient
 from app.analyzers.sentiment_analyzer import SentimentAnalyzer
 from api.coingecko.client import CoinGeckoClient
 from config.settings import settings
+from utils.cache import TTLCache
 import shap
 import numpy as np
 
+# Long-lived pool for the news lookup, shared by every engine: creating a pool per
+# call spawned and joined a thread on each cache miss
+_LOOKUP_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="engine-lookup")
+
 
 class BaseDecisionEngine:
     """
@@ -15,6 +21,8 @@ class BaseDecisionEngine:
     sentiment_analyzer: SentimentAnalyzer
     coin_gecko_client: CoinGeckoClient
     use_open_ai: bool
+    # Seconds the CoinGecko news for an asset is reused; sentiment is cached by SentimentAnalyzer
+    NEWS_CACHE_TTL = 600
 
     def __init__(
         self,
@@ -34,10 +42,12 @@ class BaseDecisionEngine:
         self.sentiment_analyzer = sentiment_analyzer
         self.coin_gecko_client = coin_gecko_client
         self.use_open_ai = settings.USE_OPEN_AI_API
+        self._news_cache = TTLCache(maxsize=256, ttl=self.NEWS_CACHE_TTL)
 
     def get_sentiment_and_news(self, symbol: str) -> Tuple[float, str]:
         """
-        Fetches overall sentiment and latest news for a given asset.
+        Fetches overall sentiment and latest news for a given asset. News younger
+        than NEWS_CACHE_TTL seconds is reused; SentimentAnalyzer caches the score.
 
         Args:
             symbol (str): Asset symbol, e.g. 'BTCUSDC'.
@@ -46,21 +56,33 @@ class BaseDecisionEngine:
             Tuple[float, str]: Sentiment score and news info string.
         """
         clean_symbol = symbol.replace("USDC", "")
+        news_info: Optional[str] = self._news_cache.get(clean_symbol)
+        if news_info is not None:
+            return self.sentiment_analyzer.get_overall_sentiment(clean_symbol), news_info
+
+        # Both lookups are independent network calls: fetch news in the background
+        # while the sentiment is computed on the calling thread
+        news_future = _LOOKUP_POOL.submit(self.coin_gecko_client.fetch_crypto_news, clean_symbol)
         sentiment: float = self.sentiment_analyzer.get_overall_sentiment(clean_symbol)
-        news_info: str = self.coin_gecko_client.fetch_crypto_news(clean_symbol)
+        news_info = news_future.result()
+
+        self._news_cache.set(clean_symbol, news_info)
         return sentiment, news_info
 
-    def send_openai_prompt(self, prompt: str) -> Optional[str]:
+    def send_openai_prompt(self, prompt: str, system_message: Optional[str] = None) -> Optional[str]:
         """
         Sends a prompt to OpenAI and returns the response.
 
         Args:
             prompt (str): Prompt text.
+            system_message (Optional[str]): System message; the client default is used if omitted.
 
         Returns:
             Optional[str]: OpenAI response or None.
         """
-        return self.openai_client.send_prompt(prompt)
+        if system_message is None:
+            return self.openai_client.send_prompt(prompt)
+        return self.openai_client.send_prompt(prompt, system_message=system_message)
 
     def explain(self, features: Dict[str, Any]) -> Dict[str, float]:
         """
@@ -1,3 +1,4 @@
+from typing import Optional
 from domain.ports import TradeDataProvider
 from config.settings import Settings
 
@@ -9,10 +10,14 @@ class QuantityCalculator:
         self.data_provider = data_provider
         self.investment_amount = settings.INVESTMENT_AMOUNT
 
-    def calculate(self, symbol: str, balance_usdc: float) -> float:
+    def calculate(self, symbol: str, balance_usdc: float, price: Optional[float] = None) -> float:
+        """
+        :param price: Precio actual si ya se conoce; si no, se consulta.
+        """
         if balance_usdc < self.investment_amount:
             return 0.0
-        price = self.data_provider.get_price(symbol)
+        if price is None:
+            price = self.data_provider.get_price(symbol)
         if price is None or price <= 0:
             return 0.0
         return self.investment_amount / price
@@ -1,15 +1,28 @@
+from string import Template
 from typing import Dict, Any
 import logging
 from app.services.base_decision_engine import BaseDecisionEngine
 from app.services.price_calculator import PriceCalculator
 from config.settings import settings
+from utils.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Instrucciones fijas: van como mensaje de sistema, idéntico en cada llamada
+SELL_SYSTEM_MESSAGE = (
+    "Eres un experto en trading de criptomonedas. Con los datos de la posición, responde solo "
+    "una opción, sin explicaciones: 'Vender Ganancia', 'Vender Pérdida' o 'Mantener'."
+)
+
 class SellDecisionEngine(BaseDecisionEngine):
     """
     Motor de decisión para ventas usando OpenAI o reglas internas.
     """
+    # Por encima de objetivo * LLM_TARGET_BAND la decisión es por reglas, sin consultar a OpenAI
+    LLM_TARGET_BAND = 1.02
+    # Segundos durante los que se reutiliza una decisión de OpenAI para la misma situación
+    LLM_DECISION_CACHE_TTL = 300
+
     def __init__(
         self,
         openai_client,
@@ -25,6 +38,20 @@ class SellDecisionEngine(BaseDecisionEngine):
         # Márgenes para decisión
         self.stop_loss_margin = settings.STOP_LOSS_MARGIN
         self.profit_margin = settings.PROFIT_MARGIN
+        # Decisiones de OpenAI por (símbolo, ganancia redondeada, sentimiento redondeado)
+        self._llm_cache = TTLCache(maxsize=512, ttl=self.LLM_DECISION_CACHE_TTL)
+        # Plantilla del mensaje de usuario: solo los datos de la decisión
+        self._prompt_tmpl = Template(
+            "Activo: $symbol\n"
+            "Compra promedio: $$$avg\n"
+            "Precio actual: $$$current\n"
+            "Cantidad: $qty\n"
+            "Ganancia: $gain%\n"
+            "Objetivo: $$$target\n"
+            "Stop loss: $$$stop\n"
+            "Sentimiento: $sentiment\n"
+            "Noticias:\n$news"
+        )
 
     def decide(
         self,
@@ -50,43 +77,49 @@ class SellDecisionEngine(BaseDecisionEngine):
         self.trailing_highs[symbol] = high
         trailing_stop = high * (1 - self.stop_loss_margin / 100)
 
-        # Decisión sin OpenAI
-        if not self.use_open_ai:
-            if current_price <= trailing_stop:
-                logger.debug(f"[{symbol}] Trailing stop alcanzado: {current_price} <= {trailing_stop}")
-                return "vender pérdida"
+        # Stop alcanzado: la venta es obligada, no se consulta a OpenAI
+        if current_price <= trailing_stop:
+            logger.debug("[%s] Trailing stop alcanzado: %s <= %s", symbol, current_price, trailing_stop)
+            return "vender pérdida"
+
+        # Decisión sin OpenAI, o con el precio claramente por encima del objetivo
+        if not self.use_open_ai or current_price >= target_price * self.LLM_TARGET_BAND:
             if current_price >= target_price and percentage_gain >= self.profit_margin:
-                logger.debug(f"[{symbol}] Objetivo de ganancia alcanzado: {percentage_gain:.2f}% >= {self.profit_margin}%")
+                logger.debug("[%s] Objetivo de ganancia alcanzado: %.2f%% >= %s%%", symbol, percentage_gain, self.profit_margin)
                 return "vender ganancia"
             return "mantener"
 
-        # Decisión con OpenAI
-        symbol = f"{asset['asset']}USDC"
+        # Decisión con OpenAI: solo en la franja ambigua entre stop y objetivo (+2%)
         sentiment, news_info = self.get_sentiment_and_news(symbol)
 
-        prompt = (
-            "Eres un experto en trading y análisis de criptomonedas.\n\n"
-            "### Datos Actuales\n"
-            f"- Activo: {symbol}\n"
-            f"- Precio de Compra Promedio: ${average_buy_price:,.6f}\n"
-            f"- Precio Actual: ${current_price:,.6f}\n"
-            f"- Cantidad Disponible: {real_balance:,.6f}\n\n"
-            "### Indicadores de Rendimiento\n"
-            f"- Porcentaje de Ganancia: {percentage_gain:.2f}%\n"
-            f"- Precio Objetivo de Venta: ${target_price:,.6f}\n"
-            f"- Precio de Stop Loss: ${trailing_stop:,.6f}\n\n"
-            f"### Sentimiento del Mercado: {sentiment:.2f}\n\n"
-            f"### Noticias Relevantes:\n{news_info}\n\n"
-            "### Pregunta\n"
-            "¿Recomiendas 'Vender Ganancia', 'Vender Pérdida' o 'Mantener'? "
-            "Responde solo una de esas opciones, sin explicaciones."
+        # Mercado lateral: la misma situación se repite en cada escaneo y no merece otra consulta
+        cache_key = (symbol, round(percentage_gain, 1), round(sentiment, 1))
+        decision = self._llm_cache.get(cache_key)
+        if decision is not None:
+            logger.debug("[%s] Decisión de OpenAI reutilizada: %s", symbol, decision)
+            return decision
+
+        prompt = self._prompt_tmpl.substitute(
+            symbol=symbol,
+            avg=f"{average_buy_price:,.6f}",
+            current=f"{current_price:,.6f}",
+            qty=f"{real_balance:,.6f}",
+            gain=f"{percentage_gain:.2f}",
+            target=f"{target_price:,.6f}",
+            stop=f"{trailing_stop:,.6f}",
+            sentiment=f"{sentiment:.2f}",
+            news=news_info
         )
-        response = self.send_openai_prompt(prompt)
+        response = self.send_openai_prompt(prompt, system_message=SELL_SYSTEM_MESSAGE)
         if not response:
+            # Sin respuesta no se cachea, para volver a consultar en el siguiente escaneo
             return "mantener"
         resp = response.lower()
         if "vender ganancia" in resp:
-            return "vender ganancia"
-        if "vender pérdida" in resp or "vender perdida" in resp:
-            return "vender pérdida"
-        return "mantener"
+            decision = "vender ganancia"
+        elif "vender pérdida" in resp or "vender perdida" in resp:
+            decision = "vender pérdida"
+        else:
+            decision = "mantener"
+        self._llm_cache.set(cache_key, decision)
+        return decision
@@ -3,6 +3,7 @@ from app.strategies.base import StrategyPlugin
 from config.settings import settings
 from api.openai.client import OpenAIClient
 from api.coingecko.client import CoinGeckoClient
+from utils.lazy import LazyProxy
 
 class ArbitrageStrategy(StrategyPlugin):
     """
@@ -12,7 +13,8 @@ class ArbitrageStrategy(StrategyPlugin):
         self.data_manager = data_manager
         self.settings = settings_obj
         self.threshold = 0.005  # 0.5% price difference
-        self.cg_client = CoinGeckoClient()
+        # Created on first analyze(): the constructor downloads CoinGecko's full coin list
+        self.cg_client = LazyProxy(CoinGeckoClient)
 
     def name(self) -> str:
         return "arbitrage"
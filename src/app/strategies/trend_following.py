@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 from typing import Dict
 from app.strategies.base import StrategyPlugin
 from config.settings import settings
@@ -25,18 +25,14 @@ class TrendFollowingStrategy(StrategyPlugin):
         )
         if not klines:
             return {"symbol": "BTCUSDC", "buy": False, "sell": False}
-        df = pd.DataFrame(klines, columns=['open_time','open','high','low','close','volume',
-                                           'close_time','quote_asset_volume','num_trades',
-                                           'taker_buy_base','taker_buy_quote','ignore'])
-        df['close'] = df['close'].astype(float)
-        df['sma_short'] = df['close'].rolling(self.short).mean()
-        df['sma_long'] = df['close'].rolling(self.long).mean()
-        if len(df) < self.long+1:
+        # Solo se usan las dos últimas medias: basta con la cola de cierres, sin DataFrame ni series rolling
+        if len(klines) < self.long + 1:
             return {"symbol": "BTCUSDC", "buy": False, "sell": False}
-        prev_short = df['sma_short'].iloc[-2]
-        prev_long = df['sma_long'].iloc[-2]
-        curr_short = df['sma_short'].iloc[-1]
-        curr_long = df['sma_long'].iloc[-1]
+        close = np.array([k[4] for k in klines[-(self.long + 1):]], dtype=np.float64)
+        prev_short = close[-self.short - 1:-1].mean()
+        prev_long = close[:-1].mean()
+        curr_short = close[-self.short:].mean()
+        curr_long = close[1:].mean()
         signal = {"symbol": "BTCUSDC", "buy": False, "sell": False, "size": self.settings.INVESTMENT_AMOUNT}
         # Cruce al alza
         if prev_short <= prev_long and curr_short > curr_long:
@@ -1,15 +1,21 @@
 """
 Registry for symbols bought under bubble_momentum override to trigger quick sell.
 """
+import threading
+
 bubble_symbols = set()
+# Buys and sells run on different threads: register() must not land between the copy and the clear
+_lock = threading.Lock()
 
 def register(symbol: str) -> None:
     """Register a symbol for quick sell."""
-    bubble_symbols.add(symbol)
+    with _lock:
+        bubble_symbols.add(symbol)
 
 
 def get_and_clear_all() -> set:
     """Retrieve and clear all registered symbols."""
-    syms = set(bubble_symbols)
-    bubble_symbols.clear()
+    with _lock:
+        syms = set(bubble_symbols)
+        bubble_symbols.clear()
     return syms
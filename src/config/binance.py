@@ -9,6 +9,9 @@ BINANCE_TESTNET_API_KEY = os.getenv('BINANCE_TESTNET_API_KEY')
 BINANCE_TESTNET_SECRET_KEY = os.getenv('BINANCE_TESTNET_SECRET_KEY')
 BINANCE_BASE_URL = os.getenv('BINANCE_BASE_URL', 'https://api.binance.com')
 BINANCE_TESTNET_URL = os.getenv('BINANCE_TESTNET_URL', 'https://testnet.binance.vision')
+# Peso máximo por minuto e IP (cabecera X-MBX-USED-WEIGHT-1M) y fracción a partir de la cual se frena
+BINANCE_WEIGHT_LIMIT_1M = int(os.getenv('BINANCE_WEIGHT_LIMIT_1M', 6000))
+BINANCE_WEIGHT_THROTTLE_RATIO = 0.9
 
 if not BINANCE_API_KEY or not BINANCE_SECRET_KEY:
     raise EnvironmentError("Las claves de API de Binance no están configuradas correctamente en el archivo .env")
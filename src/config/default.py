@@ -13,6 +13,7 @@ DEFAULT_EXT_HISTORICAL_MULTIPLIER = 2  # Multiplier for extended historical rang
 DEFAULT_USE_OPEN_AI_API = False # Do not use OpenAI API by default
 DEFAULT_MAX_EXPOSURE_PERCENT = 50  # Porcentaje máximo de exposición total (0-100)
 DEFAULT_RISK_PER_TRADE_PERCENT = 2  # Porcentaje de capital arriesgado por operación (0-100)
+DEFAULT_SELL_MAX_CONCURRENT_ASSETS = 8  # Activos analizados en paralelo en cada escaneo de ventas
 
 # Bubble detection
 BUBBLE_DETECT_WINDOW = 12  # Número de velas para medir crecimiento (ej. últimas 12 barras de 5m = 1h)
@@ -15,6 +15,8 @@ class Settings(BaseSettings):
     USE_OPEN_AI_API: bool = Field(False, env="USE_OPEN_AI_API")
     LOG_LEVEL: str = Field("INFO", env="LOG_LEVEL")
     METRICS_PORT: int = Field(8000, env="METRICS_PORT")
+    ORDERS_DB_PATH: str = Field("orders.db", env="ORDERS_DB_PATH")
+    TRAILING_HIGHS_PATH: str = Field("trailing_highs.json", env="TRAILING_HIGHS_PATH")
     # Interval settings
     DEFAULT_CHECK_PRICE_INTERVAL: str = Field(DEFAULT_CHECK_PRICE_INTERVAL, env="DEFAULT_CHECK_PRICE_INTERVAL")
     DEFAULT_HISTORICAL_RANGE_HOURS: int = Field(DEFAULT_HISTORICAL_RANGE_HOURS, env="DEFAULT_HISTORICAL_RANGE_HOURS")
@@ -26,7 +26,9 @@ class TradeDataProvider(Protocol):
     Puerto para operaciones de datos de trading.
     """
     def get_price(self, symbol: str) -> Optional[float]: ...
+    def get_all_prices(self) -> Dict[str, float]: ...
     def get_balance_summary(self) -> List[Dict[str, Any]]: ...
+    def get_free_balances(self) -> Dict[str, float]: ...
     def get_all_orders(self, symbol: str) -> Optional[List[Dict[str, Any]]]: ...
     def create_order(
         self,
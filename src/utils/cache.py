@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """
+    Cache en memoria con caducidad por entrada y tamaño máximo, segura entre hilos.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60.0):
+        """
+        :param maxsize: Número máximo de entradas; al superarlo se descarta la más antigua.
+        :param ttl: Segundos de validez de cada entrada.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Devuelve el valor si existe y no ha caducado.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Guarda un valor con la caducidad configurada.
+        """
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Los dict conservan el orden de inserción: la primera clave es la más antigua
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Elimina una entrada y devuelve su valor.
+        """
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self) -> None:
+        """
+        Vacía la cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado o lo obtiene con loader y lo guarda.
+        Los resultados None no se cachean para reintentar en la siguiente llamada.
+        """
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
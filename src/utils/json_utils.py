@@ -0,0 +1,32 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:  # orjson es opcional: sin él se usa el módulo json estándar
+    _HAS_ORJSON = False
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Decodifica JSON con orjson si está instalado.
+
+    :param data: Contenido JSON (p. ej. response.content).
+    :return: Objeto Python decodificado.
+    """
+    if _HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Serializa a una cadena JSON con orjson si está instalado; lo no serializable se convierte con str().
+
+    :param obj: Objeto a serializar.
+    :return: Cadena JSON.
+    """
+    if _HAS_ORJSON:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, ensure_ascii=False, default=str)
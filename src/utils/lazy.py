@@ -0,0 +1,35 @@
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyProxy:
+    """
+    Envoltorio que construye el objeto real en el primer acceso a uno de sus atributos.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        """
+        :param factory: Función sin argumentos que crea el objeto (p. ej. la propia clase).
+        """
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get_instance(self) -> Any:
+        """
+        Devuelve el objeto real, creándolo una sola vez aunque varios hilos accedan a la vez.
+        """
+        instance: Optional[Any] = object.__getattribute__(self, "_instance")
+        if instance is None:
+            with object.__getattribute__(self, "_lock"):
+                instance = object.__getattribute__(self, "_instance")
+                if instance is None:
+                    instance = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get_instance(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get_instance(), name, value)
@@ -1,12 +1,50 @@
+import atexit
 import logging
+import queue
 import sys
 import logging.handlers
 import os
+import threading
 import typing
 
+# Handler común a todos los loggers: encola el registro y un hilo aparte lo escribe en consola y archivo
+_queue_handler: typing.Optional[logging.handlers.QueueHandler] = None
+_queue_lock = threading.Lock()
+
+
+def _get_queue_handler() -> logging.handlers.QueueHandler:
+    """
+    Crea la primera vez la cola de logs y el hilo que la vuelca a consola y al archivo rotativo.
+    """
+    global _queue_handler
+    with _queue_lock:
+        if _queue_handler is None:
+            # Formato de logs
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+            # Handler para la consola
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+
+            # Handler rotativo para archivo
+            rotating_handler = logging.handlers.RotatingFileHandler(
+                'app.log', maxBytes=10*1024*1024, backupCount=5
+            )
+            rotating_handler.setFormatter(formatter)
+
+            log_queue: queue.Queue = queue.Queue(-1)
+            listener = logging.handlers.QueueListener(log_queue, console_handler, rotating_handler)
+            listener.start()
+            # Vaciar la cola al salir para no perder los últimos registros
+            atexit.register(listener.stop)
+            _queue_handler = logging.handlers.QueueHandler(log_queue)
+    return _queue_handler
+
+
 def setup_logger(name: str = 'binance_logger', level: typing.Union[str,int] = logging.INFO) -> logging.Logger:
     """
     Configura y devuelve un logger con el nombre y nivel especificados o según LOG_LEVEL env.
+    La escritura en consola y archivo se hace en segundo plano para no bloquear los bucles de trading.
     """
     logger = logging.getLogger(name)
     # Determine level: env var overrides parameter
@@ -17,19 +55,6 @@ def setup_logger(name: str = 'binance_logger', level: typing.Union[str,int] = lo
 
     # Evitar agregar múltiples handlers al logger
     if not logger.handlers:
-        # Formato de logs
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        # Handler para la consola
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-
-        # Handler rotativo para archivo
-        rotating_handler = logging.handlers.RotatingFileHandler(
-            'app.log', maxBytes=10*1024*1024, backupCount=5
-        )
-        rotating_handler.setFormatter(formatter)
-        logger.addHandler(rotating_handler)
+        logger.addHandler(_get_queue_handler())
 
     return logger